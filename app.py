@@ -1,76 +1,252 @@
+import time
+_IMPORT_START = time.perf_counter()
+
+import importlib
+from datetime import datetime
+import tkinter as tk
+from tkinter import messagebox
 import customtkinter as ctk
-from data_utils import ensure_csv_headers
-from month_status import ensure_month_status_csv
-
-# CSV constants
-EBAY_SKU_CSV = "ebay_sku.csv"
-EBAY_SALES_CSV = "ebay_sales.csv"
-WOO_SKU_CSV = "woo_sku.csv"
-WOO_SALES_CSV = "woo_sales.csv"
-B2B_CSV      = "b2b_data.csv"
-COSTS_CSV    = "costs_data.csv"
-
-# Import tab classes
-from ebay_tab import EbayTab
-from woo_tab import WooTab
-from b2b_tab import B2BTab
-from costs_tab import CostsTab
-from summary_tab import SummaryTab
+from data_utils import get_storage_backend, set_backup_count, recover_csv_files
+from data_store import DataStore
+from cost_cache import CostCache
+from repricing import RepricingEngine
+from io_worker import IOWorker
+from monthly_cache import MonthlyAggregateCache
+from month_snapshots import MonthSnapshots
+from profit_engine import ProfitEngine
+from report_engine import ReportEngine, REPORT_PROCESSES
+from sku_rollup import SkuRollup
+from category_store import CategoryStore
+from records import make_record_type
+from column_cache import ColumnCache
+from rollover import ROLLOVER_TABLES, months_in_range, roll_over
+from month_status import add_archive_listener, archived_months
+from storage import (
+    EBAY_SKU_CSV, EBAY_SALES_CSV, WOO_SKU_CSV, WOO_SALES_CSV, B2B_CSV, COSTS_CSV,
+    SKU_FIELDNAMES, SALES_FIELDNAMES, B2B_FIELDNAMES, COSTS_FIELDNAMES,
+    STORAGE_BACKEND, CSV_BACKUPS, TABLE_FIELDNAMES,
+    configure_storage, ensure_tables
+)
+
+# Compact __slots__ rows with interned names for the store tables (see records)
+SkuRecord   = make_record_type("SkuRecord", SKU_FIELDNAMES, interned=("month", "year", "sku", "category", "packaging"))
+SalesRecord = make_record_type("SalesRecord", SALES_FIELDNAMES, interned=("month", "year", "sku"))
+B2BRecord   = make_record_type("B2BRecord", B2B_FIELDNAMES, interned=("month", "year", "business_name"))
+CostRecord  = make_record_type("CostRecord", COSTS_FIELDNAMES, interned=("month", "year", "cost_name"))
+
+# Tabs are imported and built the first time they are selected:
+#   tab name -> (module, class, app attribute)
+TABS = {
+    "eBay":        ("ebay_tab",    "EbayTab",    "ebay_tab"),
+    "WooCommerce": ("woo_tab",     "WooTab",     "woo_tab"),
+    "B2B":         ("b2b_tab",     "B2BTab",     "b2b_tab"),
+    "Costs":       ("costs_tab",   "CostsTab",   "costs_tab"),
+    "Summary":     ("summary_tab", "SummaryTab", "summary_tab"),
+}
 
 class ProfitTrackerApp(ctk.CTk):
     def __init__(self):
+        self._startup_times = [("imports", time.perf_counter() - _IMPORT_START)]
+        self._phase_start = time.perf_counter()
         super().__init__()
         self.title("Profit Tracker Application")
         self.geometry("1300x900")
 
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
+        self._end_phase("window")
+
+        # Finish or roll back any save interrupted by a crash before anything reads the files
+        set_backup_count(CSV_BACKUPS)
+        for msg in recover_csv_files(list(TABLE_FIELDNAMES)):
+            print(f"[RECOVERY] {msg}")
+        self._end_phase("crash recovery")
+
+        configure_storage(STORAGE_BACKEND)
 
         # Ensure CSV headers
-        ensure_csv_headers(
-            EBAY_SKU_CSV,
-            [
-                "month", "year", "sku", "category",
-                "sold_price_after_vat", "sold_price_before_vat",
-                "cost_of_item", "packaging",
-                "transaction_fee", "delivery",
-                "total_expenses", "profit_margin", "profit"
-            ]
-        )
-        ensure_csv_headers(EBAY_SALES_CSV, ["month", "year", "sku", "units_sold"])
-        ensure_csv_headers(
-            WOO_SKU_CSV,
-            [
-                "month", "year", "sku", "category",
-                "sold_price_after_vat", "sold_price_before_vat",
-                "cost_of_item", "packaging",
-                "transaction_fee", "delivery",
-                "total_expenses", "profit_margin", "profit"
-            ]
+        ensure_tables()
+        self._lock_archived_months()
+        self._end_phase("storage setup")
+
+        # Load every table once; tabs read/write through self.store
+        self.store = DataStore()
+        self.store.add_table(EBAY_SKU_CSV, SKU_FIELDNAMES, key_field="sku", record_type=SkuRecord)
+        self.store.add_table(EBAY_SALES_CSV, SALES_FIELDNAMES, key_field="sku", record_type=SalesRecord)
+        self.store.add_table(WOO_SKU_CSV, SKU_FIELDNAMES, key_field="sku", record_type=SkuRecord)
+        self.store.add_table(WOO_SALES_CSV, SALES_FIELDNAMES, key_field="sku", record_type=SalesRecord)
+        self.store.add_table(B2B_CSV, B2B_FIELDNAMES, key_field="business_name", record_type=B2BRecord)
+        self.store.add_table(COSTS_CSV, COSTS_FIELDNAMES, key_field="cost_name", record_type=CostRecord)
+        self._end_phase("load tables")
+        # Typed binary copies of the sales-channel CSV files; they describe the files
+        # themselves, so they are only used with plain CSV storage (see column_cache)
+        self.column_cache = ColumnCache() if STORAGE_BACKEND == "csv" else None
+        self.profit_engine = ProfitEngine(self.store, column_cache=self.column_cache)
+        self.sku_rollup = SkuRollup(self.store, self.profit_engine)
+        self.category_store = CategoryStore(self.store, self.profit_engine)
+        self.cost_cache = CostCache(self.store)
+        self.repricing = RepricingEngine(self.store, self.cost_cache)
+        self.snapshots = MonthSnapshots(self.store, self.profit_engine)
+        # Worker processes for summaries over many uncached months (REPORT_PROCESSES = 0: serial)
+        self.report_engine = ReportEngine(STORAGE_BACKEND, processes=REPORT_PROCESSES)
+        self.monthly_cache = MonthlyAggregateCache(
+            self.store, self.profit_engine, snapshots=self.snapshots, report_engine=self.report_engine
         )
-        ensure_csv_headers(WOO_SALES_CSV, ["month", "year", "sku", "units_sold"])
-        ensure_csv_headers(B2B_CSV, ["month", "year", "business_name", "expense", "profit"])
-        ensure_csv_headers(COSTS_CSV, ["month", "year", "cost_name", "cost_value"])
-        ensure_month_status_csv()
+        self._end_phase("engines/caches")
+
+        # All later loads/saves run on this worker; the status bar shows when it is busy
+        self.io = IOWorker(self, on_error=self._show_io_error)
+        self.status_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.status_label.pack(side="bottom", fill="x", padx=10)
+        self.io.add_busy_listener(self._set_busy)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Carries every table over one month or a range of months in one go (see rollover)
+        toolbar = ctk.CTkFrame(self)
+        toolbar.pack(side="top", fill="x", padx=10, pady=(5, 0))
+        ctk.CTkButton(toolbar, text="Roll Over Months...", command=self._show_rollover_dialog).pack(side="right", padx=5)
 
         # Create the Tab View
-        self.tabview = ctk.CTkTabview(self)
+        self.tabview = ctk.CTkTabview(self, command=self._on_tab_selected)
         self.tabview.pack(fill="both", expand=True)
 
-        # Create 5 tabs
-        # We can pass the newly-created "tab" to each specialized tab class
+        # Create 5 (empty) tabs; each is filled in by _build_tab on first selection
         self.ebay_tab_frame     = self.tabview.add("eBay")
         self.woo_tab_frame      = self.tabview.add("WooCommerce")
         self.b2b_tab_frame      = self.tabview.add("B2B")
         self.costs_tab_frame    = self.tabview.add("Costs")
         self.summary_tab_frame  = self.tabview.add("Summary")
+        for _, _, attr in TABS.values():
+            setattr(self, attr, None)
+        self._end_phase("tab view")
+
+        # Only the tab shown at startup is built now
+        self._build_tab(self.tabview.get())
+        self._end_phase(f"{self.tabview.get()} tab")
+
+        # Queued after the first tab's loads: rebuild column caches left stale by the last session's saves,
+        # then those of the tables saved from here on whenever the worker runs out of work
+        if self.column_cache is not None:
+            self._stale_columns = set()
+            self.store.add_listener(self._on_table_written)
+            self.io.add_busy_listener(self._refresh_stale_columns)
+            self.io.submit(self.column_cache.refresh)
+
+        total = sum(seconds for _, seconds in self._startup_times)
+        breakdown = ", ".join(f"{label} {seconds * 1000:.0f}ms" for label, seconds in self._startup_times)
+        print(f"[STARTUP] {total * 1000:.0f}ms: {breakdown}")
+
+    def _end_phase(self, label):
+        now = time.perf_counter()
+        self._startup_times.append((label, now - self._phase_start))
+        self._phase_start = now
+
+    # --------------------------------------------------
+    # Lazy tabs
+    # --------------------------------------------------
+    def _on_tab_selected(self):
+        name = self.tabview.get()
+        if getattr(self, TABS[name][2]) is None:
+            start = time.perf_counter()
+            self._build_tab(name)
+            print(f"[STARTUP] {name} tab built on first open in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _build_tab(self, name):
+        module_name, class_name, attr = TABS[name]
+        tab_class = getattr(importlib.import_module(module_name), class_name)
+        setattr(self, attr, tab_class(self.tabview.tab(name), self))
+
+    def _set_busy(self, busy):
+        self.status_label.configure(text="Working..." if busy else "")
+        self.configure(cursor="watch" if busy else "")
+
+    def _on_table_written(self, filepath, months):
+        # store listener (on the I/O worker): the table's column cache no longer matches the file
+        if filepath in self.column_cache.column_types:
+            self._stale_columns.add(filepath)
+
+    def _refresh_stale_columns(self, busy):
+        if not busy and self._stale_columns:
+            # pop() one by one: the worker may be adding to the set meanwhile
+            filepaths = [self._stale_columns.pop() for _ in range(len(self._stale_columns))]
+            self.io.submit(lambda: self.column_cache.refresh(filepaths))
+
+    def _show_io_error(self, exc):
+        messagebox.showerror("Error", f"Could not complete the operation:\n{exc}")
+
+    def _on_close(self):
+        """After any queued saves, fold the log backend's logs back into the CSV files and exit."""
+        def job():
+            backend = get_storage_backend()
+            if hasattr(backend, "compact_all"):
+                backend.compact_all()
+            # the caches match the stored tables: record their current signatures
+            self.monthly_cache.save()
+            self.category_store.save()
+
+        self.io.submit(job, on_done=lambda _: self.destroy(), on_error=lambda _: self.destroy())
+
+    # --------------------------------------------------
+    # Roll over
+    # --------------------------------------------------
+    def _show_rollover_dialog(self):
+        top = tk.Toplevel()
+        top.title("Roll Over Months")
+        tk.Label(top, text="Carry eBay/Woo SKUs, B2B and costs forward month by month.").grid(
+            row=0, column=0, columnspan=4, padx=5, pady=5
+        )
+
+        now = datetime.now()
+        prev_year, prev_month = (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+        months = [str(i) for i in range(1, 13)]
+        years = [str(y) for y in range(2020, now.year + 3)]
+        period_vars = {}
+        for row, (label, year, month) in enumerate(
+            [("From (copied):", prev_year, prev_month), ("To (last filled):", now.year, now.month)], start=1
+        ):
+            tk.Label(top, text=label).grid(row=row, column=0, padx=5, pady=5, sticky="w")
+            month_var = tk.StringVar(value=str(month))
+            year_var = tk.StringVar(value=str(year))
+            ctk.CTkComboBox(top, values=months, variable=month_var, width=70).grid(row=row, column=1, padx=5, pady=5)
+            ctk.CTkComboBox(top, values=years, variable=year_var, width=90).grid(row=row, column=2, padx=5, pady=5)
+            period_vars[label] = (year_var, month_var)
+
+        def on_confirm():
+            (from_y, from_m), (to_y, to_m) = [(y.get(), m.get()) for y, m in period_vars.values()]
+            targets = months_in_range(from_y, from_m, to_y, to_m)[1:]
+            if not targets:
+                messagebox.showerror("Error", "The 'To' month must come after the 'From' month.")
+                return
+            top.destroy()
+            self.io.submit(lambda: roll_over(self.store, targets), on_done=lambda result: self._rollover_done(targets, result))
+
+        tk.Button(top, text="Roll Over", command=on_confirm).grid(row=3, column=0, columnspan=4, pady=5)
+
+    def _rollover_done(self, targets, result):
+        first, last = targets[0], targets[-1]
+        lines = [f"{filepath}: {result['counts'][filepath]} rows" for filepath in ROLLOVER_TABLES]
+        if result["skipped"]:
+            lines.append("Skipped (archived): " + ", ".join(f"{m}/{y}" for y, m in result["skipped"]))
+        messagebox.showinfo("Roll Over Complete", f"Rolled over into {first[1]}/{first[0]} - {last[1]}/{last[0]}:\n" + "\n".join(lines))
+        # Refresh the tabs that are already built
+        if self.ebay_tab is not None:
+            self.ebay_tab.refresh_ebay_sku_table()
+            self.ebay_tab.refresh_ebay_category_table()
+        if self.woo_tab is not None:
+            self.woo_tab.refresh_woo_sku_table()
+            self.woo_tab.refresh_woo_category_table()
+        if self.b2b_tab is not None:
+            self.b2b_tab.refresh_b2b_tables()
+        if self.costs_tab is not None:
+            self.costs_tab.refresh_costs_table()
 
-        # Instantiate each tab
-        self.ebay_tab    = EbayTab(self.ebay_tab_frame, self)
-        self.woo_tab     = WooTab(self.woo_tab_frame, self)
-        self.b2b_tab     = B2BTab(self.b2b_tab_frame, self)
-        self.costs_tab   = CostsTab(self.costs_tab_frame, self)
-        self.summary_tab = SummaryTab(self.summary_tab_frame, self)
+    def _lock_archived_months(self):
+        """Storage that can lock months (partitioned) keeps archived months read-only."""
+        backend = get_storage_backend()
+        if hasattr(backend, "set_month_locked"):
+            for year, month in archived_months():
+                backend.set_month_locked(year, month, True)
+            add_archive_listener(backend.on_archive_changed)
 
 
 def main():
@@ -3,8 +3,8 @@ from tkinter import ttk, messagebox
 import customtkinter as ctk
 from datetime import datetime
 
-from data_utils import read_csv_dicts, overwrite_csv_dicts
-from month_status import is_month_archived
+from month_status import is_month_archived, set_month_archived
+from rollover import roll_over
 
 B2B_CSV = "b2b_data.csv"
 
@@ -25,7 +25,8 @@ class B2BTab:
         self.b2b_month_cb = ctk.CTkComboBox(
             date_frame,
             values=[str(i) for i in range(1,13)],
-            variable=self.b2b_month_var
+            variable=self.b2b_month_var,
+            command=self.refresh_b2b_tables
         )
         self.b2b_month_cb.grid(row=0, column=1, padx=5, pady=5)
 
@@ -34,7 +35,8 @@ class B2BTab:
         self.b2b_year_cb = ctk.CTkComboBox(
             date_frame,
             values=[str(y) for y in range(2020, datetime.now().year+3)],
-            variable=self.b2b_year_var
+            variable=self.b2b_year_var,
+            command=self.refresh_b2b_tables
         )
         self.b2b_year_cb.grid(row=0, column=3, padx=5, pady=5)
 
@@ -111,9 +113,10 @@ class B2BTab:
     def _mark_month_done_callback(self):
         m = self.b2b_month_var.get()
         y = self.b2b_year_var.get()
-        from .month_status import set_month_archived
-        set_month_archived(y, m, archived=True)
-        messagebox.showinfo("Month Archived", f"Marked {m}/{y} as DONE.")
+        self.app.io.submit(
+            lambda: set_month_archived(y, m, archived=True),
+            on_done=lambda _: messagebox.showinfo("Month Archived", f"Marked {m}/{y} as DONE.")
+        )
 
     def _carry_over_callback(self):
         m = self.b2b_month_var.get()
@@ -122,19 +125,14 @@ class B2BTab:
             messagebox.showerror("Error", f"{m}/{y} is archived. Cannot carry over.")
             return
 
-        from .month_status import get_previous_month_year
-        from .data_utils import carry_over_data_for_tab
-        carry_over_data_for_tab(
-            B2B_CSV,
-            ["month","year","business_name","expense","profit"],
-            y, m,
-            key_fields=["business_name"],
-            read_csv_fn=read_csv_dicts,
-            overwrite_csv_fn=overwrite_csv_dicts,
-            get_previous_month_year_fn=get_previous_month_year
-        )
-        messagebox.showinfo("Carry Over Complete", f"Carried over B2B data into {m}/{y}.")
-        self.refresh_b2b_tables()
+        def job():
+            return roll_over(self.app.store, [(y, m)], [B2B_CSV])["counts"][B2B_CSV]
+
+        def done(carried):
+            messagebox.showinfo("Carry Over Complete", f"Carried over B2B data into {m}/{y}.\n{carried} rows added.")
+            self.refresh_b2b_tables()
+
+        self.app.io.submit(job, on_done=done)
 
     def add_b2b_record(self):
         month = self.b2b_month_var.get()
@@ -157,44 +155,42 @@ class B2BTab:
         except ValueError:
             profit=0.0
 
-        fieldnames=["month","year","business_name","expense","profit"]
-        existing=read_csv_dicts(B2B_CSV)
-
-        found=False
-        for row in existing:
-            if (row["month"]==month and row["year"]==year and row["business_name"]==name):
-                row["expense"] = str(expense)
-                row["profit"]  = str(profit)
-                found=True
-                break
-        if not found:
-            new_row={
+        def job():
+            b2b_table=self.app.store.table(B2B_CSV)
+            b2b_table.upsert({
                 "month": month,
                 "year": year,
                 "business_name": name,
                 "expense": str(expense),
                 "profit": str(profit)
-            }
-            existing.append(new_row)
+            })
+            b2b_table.save()
+
+        def done(_):
+            messagebox.showinfo("Success", f"B2B record for '{name}' updated.")
+            self.refresh_b2b_tables()
 
-        overwrite_csv_dicts(B2B_CSV, fieldnames, existing)
-        messagebox.showinfo("Success", f"B2B record for '{name}' updated.")
-        self.refresh_b2b_tables()
+        self.app.io.submit(job, on_done=done)
 
-    def refresh_b2b_tables(self):
+    def refresh_b2b_tables(self, *args):
+        month=self.b2b_month_var.get()
+        year=self.b2b_year_var.get()
+        self.app.io.submit(
+            lambda: list(self.app.store.table(B2B_CSV).month_rows(year, month)),
+            on_done=self._render_b2b_tables,
+            channel="b2b_tables"
+        )
+
+    def _render_b2b_tables(self, data):
         # clear
         for row in self.profit_tree.get_children():
             self.profit_tree.delete(row)
         for row in self.expense_tree.get_children():
             self.expense_tree.delete(row)
 
-        month=self.b2b_month_var.get()
-        year=self.b2b_year_var.get()
-        data=read_csv_dicts(B2B_CSV)
         for row in data:
-            if row["month"]==month and row["year"]==year:
-                bname=row["business_name"]
-                exp  =row["expense"]
-                prof =row["profit"]
-                self.profit_tree.insert("", tk.END, values=(bname, "£"+prof))
-                self.expense_tree.insert("", tk.END, values=(bname, "£"+exp))
+            bname=row["business_name"]
+            exp  =row["expense"]
+            prof =row["profit"]
+            self.profit_tree.insert("", tk.END, values=(bname, "£"+prof))
+            self.expense_tree.insert("", tk.END, values=(bname, "£"+exp))
@@ -0,0 +1,111 @@
+"""
+Benchmark: per-row Python loop (old SummaryTab._build_monthly_aggregates style)
+vs. the columnar ProfitEngine, on a synthetic sales history.
+
+    python benchmarks/bench_profit_engine.py [--sales-rows 1000000] [--months 100]
+
+Nothing is written to disk; the tables live only in memory.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import DataStore, Table
+from profit_engine import ProfitEngine, EBAY_SKU_CSV, EBAY_SALES_CSV, WOO_SKU_CSV, WOO_SALES_CSV
+
+
+def build_store(sales_rows, months):
+    rng = random.Random(42)
+    skus_per_month = max(1, sales_rows // months)
+    categories = [f"Category {i}" for i in range(40)]
+    sku_rows = []
+    sale_rows = []
+    for p in range(months):
+        year, month = str(2015 + p // 12), str(p % 12 + 1)
+        for i in range(skus_per_month):
+            sku = f"SKU-{i}"
+            sku_rows.append({
+                "month": month, "year": year, "sku": sku,
+                "category": categories[i % len(categories)],
+                "sold_price_before_vat": f"{rng.uniform(3, 30):.2f}",
+                "profit": f"{rng.uniform(-2, 20):.2f}",
+            })
+            sale_rows.append({
+                "month": month, "year": year, "sku": sku,
+                "units_sold": str(rng.randint(0, 50)),
+            })
+
+    store = DataStore()
+    for filepath, rows in [(EBAY_SKU_CSV, sku_rows), (EBAY_SALES_CSV, sale_rows),
+                           (WOO_SKU_CSV, []), (WOO_SALES_CSV, [])]:
+        table = Table(filepath, list(rows[0].keys()) if rows else [], "sku")
+        table.bulk_upsert(rows)
+        store.tables[filepath] = table
+    return store
+
+
+def loop_monthly_totals(store):
+    """The pre-engine algorithm: parse and join row by row."""
+    totals = {}
+    profit_map = {}
+    for row in store.table(EBAY_SKU_CSV).rows:
+        try:
+            p = float(row["profit"])
+        except ValueError:
+            p = 0.0
+        profit_map[(row["year"], row["month"], row["sku"])] = p
+    for s_row in store.table(EBAY_SALES_CSV).rows:
+        key = (s_row["year"], s_row["month"], s_row["sku"])
+        try:
+            units_sold = int(s_row["units_sold"])
+        except ValueError:
+            units_sold = 0
+        if key in profit_map:
+            totals[key[:2]] = totals.get(key[:2], 0.0) + profit_map[key] * units_sold
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sales-rows", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=100)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    store = build_store(args.sales_rows, args.months)
+    print(f"Synthetic data: {len(store.table(EBAY_SALES_CSV).rows):,} sales rows, "
+          f"{len(store.table(EBAY_SKU_CSV).rows):,} SKU rows "
+          f"({time.perf_counter() - t0:.1f}s to build)")
+
+    t0 = time.perf_counter()
+    expected = loop_monthly_totals(store)
+    loop_time = time.perf_counter() - t0
+
+    engine = ProfitEngine(store).channel("ebay")
+    t0 = time.perf_counter()
+    cold = engine.monthly_totals()
+    cold_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    engine.monthly_totals()
+    warm_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    key = next(iter(cold))
+    engine.block(*key).category_totals()
+    cat_time = time.perf_counter() - t0
+
+    worst = max(abs(cold[k] - expected.get(k, 0.0)) for k in cold)
+    print(f"Python loop, monthly totals:          {loop_time:8.3f}s")
+    print(f"Engine, monthly totals (cold parse):  {cold_time:8.3f}s")
+    print(f"Engine, monthly totals (cached):      {warm_time:8.3f}s")
+    print(f"Engine, one month's category totals:  {cat_time:8.3f}s")
+    print(f"Max difference vs loop: £{worst:.6f}")
+
+
+if __name__ == "__main__":
+    main()
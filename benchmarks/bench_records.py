@@ -0,0 +1,91 @@
+"""
+Benchmark: memory held by a long SKU history as csv.DictReader-style dicts
+vs. the interned __slots__ records of records.py.
+
+    python benchmarks/bench_records.py [--rows 500000] [--skus 2000]
+
+The synthetic history is written to a temporary CSV file and read back both
+ways, so every value is a fresh string just as it is after a real load.
+"""
+import argparse
+import csv
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_utils import read_csv_file, write_csv_file
+from records import make_record_type
+
+SKU_FIELDNAMES = [
+    "month", "year", "sku", "category",
+    "sold_price_after_vat", "sold_price_before_vat",
+    "cost_of_item", "packaging",
+    "transaction_fee", "delivery",
+    "total_expenses", "profit_margin", "profit"
+]
+SkuRecord = make_record_type("SkuRecord", SKU_FIELDNAMES, interned=("month", "year", "sku", "category", "packaging"))
+
+
+def write_history(filepath, rows, skus):
+    rng = random.Random(42)
+    categories = ["Small Dendrobaena", "Large Dendrobaena", "Worm Food", "Bedding", "Composting Kits"]
+    packaging = ["White tub - 1.8 litres", "Box S, 0.30", "Bubble Mailer", "Box M"]
+    data = []
+    for i in range(rows):
+        p, n = divmod(i, skus)
+        after_vat = rng.uniform(3, 40)
+        data.append({
+            "month": str(p % 12 + 1), "year": str(2000 + p // 12),
+            "sku": f"WD-{n:05d}", "category": categories[n % len(categories)],
+            "sold_price_after_vat": f"{after_vat:.2f}", "sold_price_before_vat": f"{after_vat / 1.2:.2f}",
+            "cost_of_item": f"{rng.uniform(0.1, 5):.2f}", "packaging": packaging[n % len(packaging)],
+            "transaction_fee": f"{rng.uniform(0.3, 4):.2f}", "delivery": f"{rng.uniform(0, 4):.2f}",
+            "total_expenses": f"{rng.uniform(1, 10):.2f}", "profit_margin": f"{rng.uniform(-10, 80):.2f}",
+            "profit": f"{rng.uniform(-2, 20):.2f}",
+        })
+    write_csv_file(filepath, SKU_FIELDNAMES, data)
+
+
+def measure(load):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rows = load()
+    elapsed = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--skus", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "ebay_sku.csv")
+        write_history(filepath, args.rows, args.skus)
+
+        dicts, dict_bytes, dict_time = measure(lambda: read_csv_file(filepath))
+        del dicts
+        records, record_bytes, record_time = measure(lambda: [SkuRecord(r) for r in read_csv_file(filepath)])
+
+        # records must write back exactly like the dicts they replace
+        with open(os.path.join(tmp, "check.csv"), "w", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=SKU_FIELDNAMES).writerows(records[:1000])
+
+    print(f"{args.rows:,} SKU rows, {args.skus:,} distinct SKUs")
+    print(f"List of dicts:        {dict_bytes / 2**20:8.1f} MiB  ({dict_bytes / args.rows:6.0f} B/row)  load {dict_time:6.2f}s")
+    print(f"Interned records:     {record_bytes / 2**20:8.1f} MiB  ({record_bytes / args.rows:6.0f} B/row)  load {record_time:6.2f}s")
+    print(f"Saved: {100 * (1 - record_bytes / dict_bytes):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: monthly report totals for every month of a synthetic history,
+serial vs. the report engine's process pool at increasing worker counts.
+
+    python benchmarks/bench_report_engine.py [--years 10] [--skus 50000] [--sold 0.2] [--processes 1 2 4 8]
+
+Every SKU is listed in every month of both channels (as carry-over leaves
+them) and a `--sold` fraction of them has a sales row. The tables are written
+as plain CSV files in a temporary directory; the repository's files are not
+touched. Large settings take a while to generate and a few GB of disk.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_engine import ReportEngine
+from storage import (
+    EBAY_SKU_CSV, EBAY_SALES_CSV, WOO_SKU_CSV, WOO_SALES_CSV, B2B_CSV,
+    SKU_FIELDNAMES, SALES_FIELDNAMES, B2B_FIELDNAMES
+)
+
+
+def write_history(years, skus, sold):
+    rng = random.Random(42)
+    categories = [f"Category {i}" for i in range(40)]
+    months = [(str(2015 + p // 12), str(p % 12 + 1)) for p in range(years * 12)]
+    for sku_csv, sales_csv in [(EBAY_SKU_CSV, EBAY_SALES_CSV), (WOO_SKU_CSV, WOO_SALES_CSV)]:
+        with open(sku_csv, "w", newline="", encoding="utf-8") as f_sku, \
+             open(sales_csv, "w", newline="", encoding="utf-8") as f_sales:
+            sku_writer, sales_writer = csv.writer(f_sku), csv.writer(f_sales)
+            sku_writer.writerow(SKU_FIELDNAMES)
+            sales_writer.writerow(SALES_FIELDNAMES)
+            for year, month in months:
+                for i in range(skus):
+                    sku = f"SKU-{i:05d}"
+                    sku_writer.writerow([
+                        month, year, sku, categories[i % len(categories)],
+                        "9.99", "8.33", "1.20", "Box S", "1.50", "2.99", "5.69", "31.70",
+                        f"{rng.uniform(-2, 20):.2f}",
+                    ])
+                    if rng.random() < sold:
+                        sales_writer.writerow([month, year, sku, rng.randint(1, 50)])
+    with open(B2B_CSV, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(B2B_FIELDNAMES)
+        for year, month in months:
+            for i in range(20):
+                writer.writerow([month, year, f"Business {i}", f"{rng.uniform(0, 200):.2f}", f"{rng.uniform(0, 500):.2f}"])
+    return months
+
+
+def run(months, processes):
+    engine = ReportEngine("csv", processes=processes)
+    try:
+        if processes:
+            engine.compute_months(months[:1])   # start the workers outside the timing
+        t0 = time.perf_counter()
+        result = engine.compute_months(months)
+        return result, time.perf_counter() - t0
+    finally:
+        engine.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--skus", type=int, default=50_000)
+    parser.add_argument("--sold", type=float, default=0.2, help="fraction of SKUs with sales each month")
+    parser.add_argument("--processes", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            t0 = time.perf_counter()
+            months = write_history(args.years, args.skus, args.sold)
+            print(f"{args.years} years x {args.skus:,} SKUs x 2 channels "
+                  f"({time.perf_counter() - t0:.1f}s to write), {os.cpu_count()} cores")
+            if (os.cpu_count() or 1) < 2:
+                print("One core: the workers take turns, so the pool cannot beat the serial run here.")
+
+            serial, serial_time = run(months, 0)
+            print(f"Serial:        {serial_time:7.2f}s")
+            for processes in args.processes:
+                result, elapsed = run(months, processes)
+                assert result == serial, "pool totals differ from the serial run"
+                print(f"{processes:2d} processes:  {elapsed:7.2f}s  ({serial_time / elapsed:4.2f}x)")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: headless import of a synthetic eBay order export (cli import-sales).
+
+    python benchmarks/bench_sales_import.py [--lines 1000000] [--skus 5000] [--months 24]
+
+Runs in a temporary directory; the repository's CSV files are not touched.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cli
+
+
+def write_export(filepath, lines, skus, months):
+    rng = random.Random(42)
+    month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    with open(filepath, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([])
+        writer.writerow(["Sales Record Number", "Order Number", "Custom Label", "Quantity", "Sold For", "Sale Date"])
+        for i in range(lines):
+            p = rng.randrange(months)
+            date = f"{month_names[p % 12]}-{rng.randint(1, 28):02d}-{20 + p // 12:02d}"
+            writer.writerow([i, f"12-0000-{i:07d}", f"WD-{rng.randrange(skus):05d}", rng.randint(1, 4), "9.99", date])
+        writer.writerow([f"{lines} record(s) downloaded"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--skus", type=int, default=5000)
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            t0 = time.perf_counter()
+            write_export("orders.csv", args.lines, args.skus, args.months)
+            print(f"Synthetic export: {args.lines:,} lines ({time.perf_counter() - t0:.1f}s to write)")
+            cli.main(["import-sales", "ebay", "orders.csv"])
+        finally:
+            os.chdir(cwd)
+    print(f"Tk imported: {'tkinter' in sys.modules}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Per-category totals over time for the eBay and WooCommerce channels.
+
+For every (channel, category, year, month) the store keeps the month's
+
+    units     units sold of the category's SKUs
+    revenue   units x sold price before VAT
+    expenses  units x total expenses per item (revenue - profit)
+    profit    line profit
+
+kept in CATEGORY_STORE_JSON like the monthly cache: adding a SKU, moving a
+SKU to another category or pasting sales saves the channel's SKU or sales
+table, and the data store listener drops that channel's totals for just the
+months written. A channel whose tables were written outside the app (the
+CLI, a hand edit) is caught on load by its storage signature and starts over.
+Missing months are recomputed from the profit engine's month blocks (one
+bincount per month) the next time they are asked for. Sales lines whose SKU
+has no data for the month have no category and are not counted. Like the
+monthly cache, the JSON file is only written when the app closes.
+"""
+import numpy as np
+
+from data_utils import period_key, read_json_cache, write_json_cache
+
+CATEGORY_STORE_JSON = "category_aggregates.json"
+
+METRICS = ("units", "revenue", "expenses", "profit")
+
+
+def month_category_totals(block):
+    """{category -> {"units", "revenue", "expenses", "profit"}} for one profit_engine.MonthBlock."""
+    if not block.categories:
+        return {}
+    matched = block.matched
+    idx = block.sales_sku_idx[matched]
+    codes = block.sku_category[idx]
+    units = block.units[matched]
+    revenue = block.sku_price[idx] * units
+    size = len(block.categories)
+    sums = {
+        "units": np.bincount(codes, weights=units, minlength=size),
+        "revenue": np.bincount(codes, weights=revenue, minlength=size),
+        "profit": np.bincount(codes, weights=block.line_profit[matched], minlength=size),
+    }
+    lines = np.bincount(codes, minlength=size)
+    totals = {}
+    for i, category in enumerate(block.categories):
+        if lines[i]:
+            totals[category] = {
+                "units": int(sums["units"][i]),
+                "revenue": float(sums["revenue"][i]),
+                "expenses": float(sums["revenue"][i] - sums["profit"][i]),
+                "profit": float(sums["profit"][i]),
+            }
+    return totals
+
+
+class CategoryStore:
+    def __init__(self, store, profit_engine, cache_path=CATEGORY_STORE_JSON):
+        self.store = store
+        self.profit_engine = profit_engine
+        self.cache_path = cache_path
+        # (channel, year, month) -> {category -> {"units", "revenue", "expenses", "profit"}}
+        self.months = {}
+        self._channel_of = {}   # table filepath -> channel
+        for channel, engine in profit_engine.channels.items():
+            for filepath in (engine.sku_csv, engine.sales_csv):
+                self._channel_of[filepath] = channel
+        self._unsaved = False   # months or table signatures changed since the file was written
+        self._load()
+        for filepath in self._channel_of:
+            store.table(filepath).add_listener(self.invalidate)
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+    def _load(self):
+        saved, stale_files = read_json_cache(self.cache_path, list(self._channel_of))
+        # A channel whose tables were written outside the app loses its totals
+        stale = {self._channel_of[f] for f in stale_files}
+        for key_str, categories in saved.get("months", {}).items():
+            channel, year, month = key_str.split("-")
+            if channel not in stale:
+                self.months[(channel, year, month)] = categories
+        self._unsaved = bool(stale)
+
+    def save(self):
+        """Write the cache file, if anything changed since it was last written."""
+        if not self._unsaved:
+            return
+        write_json_cache(self.cache_path, list(self._channel_of), {
+            "months": {f"{c}-{y}-{m}": categories for (c, y, m), categories in self.months.items()},
+        })
+        self._unsaved = False
+
+    # --------------------------------------------------
+    # Invalidation / lookup
+    # --------------------------------------------------
+    def invalidate(self, filepath, months):
+        """Data store listener: drop the written channel's totals for `months`."""
+        channel = self._channel_of[filepath]
+        for year, month in months:
+            self.months.pop((channel, year, month), None)
+        self._unsaved = True
+
+    def _channel_months(self, channel, start=None, end=None):
+        sales_csv = self.profit_engine.channel(channel).sales_csv
+        months = self.store.table(sales_csv).months()
+        if start is not None:
+            months = [ym for ym in months if period_key(*start) <= period_key(*ym) <= period_key(*end)]
+        return months
+
+    def _fill(self, channels, start, end):
+        """Compute the totals of any month in range that is not stored yet."""
+        for channel in channels:
+            engine = self.profit_engine.channel(channel)
+            for year, month in self._channel_months(channel, start, end):
+                if (channel, year, month) not in self.months:
+                    self.months[(channel, year, month)] = month_category_totals(engine.block(year, month))
+                    self._unsaved = True
+
+    def trend(self, start, end, channels=None):
+        """
+        Category totals per month from `start` to `end` ((year, month), inclusive),
+        summed over `channels` (default: all): {category -> {(year, month) -> totals}}.
+        """
+        channels = list(channels or self.profit_engine.channels)
+        start, end = (str(start[0]), str(start[1])), (str(end[0]), str(end[1]))
+        self._fill(channels, start, end)
+
+        result = {}
+        for channel in channels:
+            for year, month in self._channel_months(channel, start, end):
+                for category, totals in self.months[(channel, year, month)].items():
+                    summed = result.setdefault(category, {}).setdefault(
+                        (year, month), dict.fromkeys(METRICS, 0)
+                    )
+                    for metric in METRICS:
+                        summed[metric] += totals[metric]
+        return result
@@ -0,0 +1,135 @@
+"""
+Headless command line for the profit tracker (Tk is never imported).
+
+    python cli.py import-sales ebay orders.csv
+    python cli.py import-sales woo orders.csv --date-format "%d/%m/%Y %H:%M" --mode add
+    python cli.py --storage sqlite export-csv
+
+import-sales streams a marketplace order export once, adds up the quantity
+per (year, month, SKU) in bounded memory and upserts the totals into the
+channel's sales table with one write (see sales_ingest). By default a month's
+imported totals replace units_sold, the same as pasting the SKU and units
+columns into the eBay/WooCommerce tab; --mode add adds them instead. Months
+that are archived are left out. Run it while the app is closed: the app keeps
+its own copy of the tables in memory.
+
+export-csv writes every table held by the sqlite or partitioned storage back
+out to its CSV file, e.g. for a spreadsheet or to switch back to plain CSV.
+"""
+import argparse
+import sys
+import time
+
+from data_store import DataStore
+from data_utils import get_storage_backend, recover_csv_files, set_backup_count
+from sales_ingest import DATE_FORMATS, MAX_GROUPS, MODES, OrderAggregator, iter_order_lines, merge_into_table
+from storage import (
+    EBAY_SALES_CSV, WOO_SALES_CSV, SALES_FIELDNAMES,
+    STORAGE_BACKEND, CSV_BACKUPS, TABLE_FIELDNAMES,
+    configure_storage, ensure_tables
+)
+
+SALES_TABLES = {"ebay": EBAY_SALES_CSV, "woo": WOO_SALES_CSV}
+
+# Columns of each marketplace's order export (all can be overridden on the command line)
+EXPORT_COLUMNS = {
+    "ebay": {"sku": "Custom Label", "qty": "Quantity", "date": "Sale Date"},
+    "woo":  {"sku": "SKU", "qty": "Quantity", "date": "Order Date"},
+}
+
+
+def import_sales(channel, filepath, sku_column=None, qty_column=None, date_column=None,
+                 date_formats=DATE_FORMATS, mode="replace", max_groups=MAX_GROUPS):
+    """
+    Import an order export into the channel's sales table ("ebay" / "woo"); see
+    sales_ingest for the modes. Returns the read stats plus the merge counts.
+    """
+    columns = EXPORT_COLUMNS[channel]
+    stats = {}
+    lines = iter_order_lines(
+        filepath,
+        sku_column or columns["sku"], qty_column or columns["qty"], date_column or columns["date"],
+        date_formats, stats
+    )
+    table = DataStore().add_table(SALES_TABLES[channel], SALES_FIELDNAMES, key_field="sku")
+    with OrderAggregator(max_groups) as aggregator:
+        aggregator.add_all(lines)
+        stats.update(merge_into_table(table, aggregator, mode))
+    return stats
+
+
+def export_tables(kind):
+    """
+    Write every table from the storage backend `kind` back to its CSV file.
+    Returns {filepath -> rows written}, or None if `kind` keeps the CSV files themselves.
+    """
+    if kind == "sqlite":
+        from sqlite_backend import export_csv_files
+    elif kind == "partitioned":
+        from partitioned_backend import export_csv_files
+    else:
+        return None
+    return export_csv_files(get_storage_backend(), TABLE_FIELDNAMES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profit tracker command line (no GUI).")
+    parser.add_argument("--storage", default=STORAGE_BACKEND,
+                        choices=["csv", "sqlite", "log", "clustered", "partitioned"],
+                        help="storage backend the app is configured with (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imp = commands.add_parser("import-sales", help="add an eBay/WooCommerce order export to the sales table")
+    imp.add_argument("channel", choices=sorted(SALES_TABLES))
+    imp.add_argument("export", help="order export CSV file")
+    imp.add_argument("--sku-column", help="column holding the SKU")
+    imp.add_argument("--qty-column", help="column holding the quantity")
+    imp.add_argument("--date-column", help="column holding the order date")
+    imp.add_argument("--date-format", action="append",
+                     help="strptime format of the order date (repeatable; default: common formats)")
+    imp.add_argument("--mode", choices=MODES, default="replace",
+                     help="replace the months' units_sold or add to them (default: %(default)s)")
+    imp.add_argument("--max-groups", type=int, default=MAX_GROUPS,
+                     help="SKU-month sums held in memory before spilling to disk (default: %(default)s)")
+
+    commands.add_parser("export-csv", help="write every table from the storage backend back to its CSV file")
+    args = parser.parse_args(argv)
+
+    set_backup_count(CSV_BACKUPS)
+    for msg in recover_csv_files(list(TABLE_FIELDNAMES)):
+        print(f"[RECOVERY] {msg}")
+    configure_storage(args.storage)
+    ensure_tables()
+
+    if args.command == "import-sales":
+        start = time.perf_counter()
+        try:
+            stats = import_sales(
+                args.channel, args.export, args.sku_column, args.qty_column, args.date_column,
+                tuple(args.date_format) if args.date_format else DATE_FORMATS,
+                args.mode, args.max_groups
+            )
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+        elapsed = time.perf_counter() - start
+        rate = stats["lines"] / elapsed if elapsed > 0 else 0.0
+        print(f"Read {stats['lines']:,} order lines in {elapsed:.2f}s ({rate:,.0f} lines/s), "
+              f"{stats['skipped']:,} skipped.")
+        print(f"{SALES_TABLES[args.channel]}: {stats['sku_months']:,} SKU-months written "
+              f"({stats['inserted']:,} new, {stats['updated']:,} updated).")
+        if stats["archived_months"]:
+            months = ", ".join(f"{m}/{y}" for y, m in stats["archived_months"])
+            print(f"[WARNING] Left out archived months: {months}")
+
+    elif args.command == "export-csv":
+        counts = export_tables(args.storage)
+        if counts is None:
+            print(f"Nothing to export: {args.storage} storage keeps the CSV files themselves.")
+        for filepath, n in (counts or {}).items():
+            print(f"{filepath}: {n:,} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
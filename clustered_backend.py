@@ -0,0 +1,272 @@
+"""
+Period-clustered CSV storage for the profit tracker tables.
+
+Each CSV file is kept sorted by (year, month), so every month is one
+contiguous block of lines, and a sidecar "<file>.idx" records where each
+block starts and ends:
+
+    {"size": int, "mtime_ns": int, "fields": [...], "data_start": int,
+     "blocks": [[year, month, start, end], ...]}      # byte offsets, file order
+
+Reading one month seeks straight to its block. Writing a month re-encodes
+only that block; the bytes before and after it are copied across unparsed
+(and since new months sort last, the block the app edits is usually at the
+end of the file). The sidecar is checked against the file's size and mtime,
+and rebuilt with one scan if the file changed behind its back; a file that is
+not clustered yet (e.g. the first time this backend is used) is sorted once.
+
+Enable it with data_utils.set_storage_backend(ClusteredCsvBackend(...)).
+"""
+import bisect
+import csv
+import io
+import json
+import os
+
+from data_utils import (
+    atomic_write,
+    get_backup_count,
+    period_key,
+    read_csv_file,
+    read_csv_header,
+    write_csv_file
+)
+
+INDEX_SUFFIX = ".idx"
+COPY_CHUNK = 1 << 20
+
+
+def _iter_records(f):
+    """Yields (start, end, values) for every CSV record of binary file `f` from its position."""
+    while True:
+        start = f.tell()
+        line = f.readline()
+        if not line:
+            return
+        # a quoted field may span lines: keep reading until the quotes balance
+        while line.count(b'"') % 2:
+            more = f.readline()
+            if not more:
+                break
+            line += more
+        yield start, f.tell(), next(csv.reader([line.decode("utf-8")]), [])
+
+
+def _encode_rows(fieldnames, rows):
+    buf = io.StringIO(newline="")
+    writer = csv.DictWriter(buf, fieldnames=fieldnames)
+    for row in rows:
+        writer.writerow(row)
+    return buf.getvalue().encode("utf-8")
+
+
+def _copy_range(src, dst, start, end):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = src.read(min(COPY_CHUNK, remaining))
+        if not chunk:
+            break
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+class ClusteredCsvBackend:
+    def __init__(self, primary_keys):
+        """primary_keys: { csv_filepath -> ("year", "month", "sku"), ... }"""
+        self.primary_keys = primary_keys
+        self._indexes = {}   # filepath -> index dict (see module docstring) + "lookup"
+
+    def _index_path(self, filepath):
+        return filepath + INDEX_SUFFIX
+
+    # --------------------------------------------------
+    # Sidecar index
+    # --------------------------------------------------
+    def _index(self, filepath):
+        """The block index for `filepath`, loaded or rebuilt if it no longer matches the file."""
+        st = os.stat(filepath)
+        index = self._indexes.get(filepath)
+        if index is None:
+            try:
+                with open(self._index_path(filepath), "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+        if index is None or index["size"] != st.st_size or index["mtime_ns"] != st.st_mtime_ns:
+            index = self._build_index(filepath)
+        if "lookup" not in index:
+            index["lookup"] = {(b[0], b[1]): (b[2], b[3]) for b in index["blocks"]}
+        self._indexes[filepath] = index
+        return index
+
+    def _build_index(self, filepath):
+        """Scan the file once for its month blocks; sorts it first if it is not clustered."""
+        with open(filepath, "rb") as f:
+            fields = next(csv.reader([f.readline().decode("utf-8")]), [])
+            data_start = f.tell()
+            year_pos, month_pos = fields.index("year"), fields.index("month")
+            blocks = []
+            seen = set()
+            clustered = True
+            for start, end, values in _iter_records(f):
+                if not values:
+                    if blocks:
+                        blocks[-1][3] = end   # blank line: part of the block it follows
+                    continue
+                key = tuple(values[p] if p < len(values) else "" for p in (year_pos, month_pos))
+                if blocks and (blocks[-1][0], blocks[-1][1]) == key:
+                    blocks[-1][3] = end
+                    continue
+                if key in seen or (blocks and period_key(*key) < period_key(blocks[-1][0], blocks[-1][1])):
+                    clustered = False
+                    break
+                seen.add(key)
+                blocks.append([key[0], key[1], start, end])
+
+        if not clustered:
+            rows = read_csv_file(filepath)
+            rows.sort(key=lambda r: period_key(r["year"], r["month"]))   # stable: file order kept per month
+            write_csv_file(filepath, fields, rows)
+            return self._build_index(filepath)
+
+        index = {"fields": fields, "data_start": data_start, "blocks": blocks}
+        self._save_index(filepath, index)
+        return index
+
+    def _save_index(self, filepath, index):
+        st = os.stat(filepath)
+        index["size"] = st.st_size
+        index["mtime_ns"] = st.st_mtime_ns
+        index["lookup"] = {(b[0], b[1]): (b[2], b[3]) for b in index["blocks"]}
+        saved = {k: v for k, v in index.items() if k != "lookup"}
+        with atomic_write(self._index_path(filepath)) as f:
+            json.dump(saved, f, separators=(",", ":"))
+        self._indexes[filepath] = index
+
+    # --------------------------------------------------
+    # Block reads / writes
+    # --------------------------------------------------
+    def read_month(self, filepath, year, month):
+        """The rows of one (year, month), read from its block only."""
+        if not os.path.isfile(filepath):
+            return []
+        index = self._index(filepath)
+        span = index["lookup"].get((str(year), str(month)))
+        if span is None:
+            return []
+        with open(filepath, "rb") as f:
+            f.seek(span[0])
+            data = f.read(span[1] - span[0]).decode("utf-8")
+        return list(csv.DictReader(io.StringIO(data, newline=""), fieldnames=index["fields"]))
+
+    def write_months(self, filepath, fieldnames, new_rows):
+        """
+        new_rows: { (year, month) -> [row, ...] } replacing those months' blocks
+        (an empty list removes the month). Everything else is copied as raw bytes.
+        """
+        if read_csv_header(filepath) != list(fieldnames):
+            # columns changed: the blocks can't be spliced, rewrite the lot
+            rows = [r for r in self.read_dicts(filepath) if (r["year"], r["month"]) not in new_rows]
+            for month_rows in new_rows.values():
+                rows.extend(month_rows)
+            self.overwrite_dicts(filepath, fieldnames, rows)
+            return
+        index = self._index(filepath)
+        fields = index["fields"]
+        lookup = index["lookup"]
+
+        keys = [(b[0], b[1]) for b in index["blocks"]]
+        periods = [period_key(*k) for k in keys]
+        for key in new_rows:
+            if key not in lookup:
+                pos = bisect.bisect_right(periods, period_key(*key))
+                keys.insert(pos, key)
+                periods.insert(pos, period_key(*key))
+
+        blocks = []
+        with open(filepath, "rb") as src, atomic_write(filepath, backups=get_backup_count(), binary=True) as dst:
+            _copy_range(src, dst, 0, index["data_start"])
+            run = None   # (start, end) of consecutive unchanged blocks still to copy
+            run_keys = []
+            for key in keys + [None]:
+                if key is not None and key not in new_rows:
+                    start, end = lookup[key]
+                    run = (run[0] if run else start, end)
+                    run_keys.append((key, end - start))
+                    continue
+                if run:
+                    _copy_range(src, dst, *run)
+                    pos = dst.tell() - (run[1] - run[0])
+                    for run_key, length in run_keys:
+                        blocks.append([run_key[0], run_key[1], pos, pos + length])
+                        pos += length
+                    run, run_keys = None, []
+                if key is not None and new_rows[key]:
+                    start = dst.tell()
+                    dst.write(_encode_rows(fields, new_rows[key]))
+                    blocks.append([key[0], key[1], start, dst.tell()])
+
+        index["blocks"] = blocks
+        self._save_index(filepath, index)
+
+    # --------------------------------------------------
+    # Storage backend interface (see data_utils)
+    # --------------------------------------------------
+    def ensure_table(self, filepath, headers):
+        if not os.path.isfile(filepath):
+            write_csv_file(filepath, headers, [])
+        self._index(filepath)
+
+    def read_dicts(self, filepath):
+        if not os.path.isfile(filepath):
+            return []
+        self._index(filepath)   # clusters the file first if needed
+        return read_csv_file(filepath)
+
+    def overwrite_dicts(self, filepath, fieldnames, data):
+        rows = sorted(data, key=lambda r: period_key(r["year"], r["month"]))
+        write_csv_file(filepath, fieldnames, rows)
+        self._indexes.pop(filepath, None)
+        self._build_index(filepath)
+
+    def upsert_dicts(self, filepath, fieldnames, rows):
+        by_month = {}
+        for row in rows:
+            by_month.setdefault((row["year"], row["month"]), []).append(row)
+        self.write_months(filepath, fieldnames, {
+            key: self._merge(filepath, self.read_month(filepath, *key), month_rows)
+            for key, month_rows in by_month.items()
+        })
+
+    def _merge(self, filepath, existing, rows):
+        """Upsert `rows` into the `existing` list on the primary key (first existing row wins)."""
+        pk = self.primary_keys[filepath]
+        by_key = {}
+        for row in existing:
+            by_key.setdefault(tuple(row.get(k, "") for k in pk), row)
+        for row in rows:
+            key = tuple(row.get(k, "") for k in pk)
+            if key in by_key:
+                by_key[key].update(row)
+            else:
+                by_key[key] = dict(row)
+                existing.append(by_key[key])
+        return existing
+
+    def delete_keys(self, filepath, keys):
+        """keys: iterable of primary-key tuples, in primary_keys[filepath] order."""
+        pk = self.primary_keys[filepath]
+        year_pos, month_pos = pk.index("year"), pk.index("month")
+        by_month = {}
+        for key in keys:
+            by_month.setdefault((key[year_pos], key[month_pos]), set()).add(tuple(key))
+
+        new_rows = {}
+        for month_key, dead in by_month.items():
+            rows = self.read_month(filepath, *month_key)
+            kept = [r for r in rows if tuple(r.get(k, "") for k in pk) not in dead]
+            if len(kept) != len(rows):
+                new_rows[month_key] = kept
+        if new_rows:
+            self.write_months(filepath, read_csv_header(filepath), new_rows)
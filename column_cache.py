@@ -0,0 +1,190 @@
+"""
+Binary column cache for the sales-channel tables.
+
+Parsing CSV text (csv.DictReader, then float()/int() per value) is most of
+the work behind the sales reports and the monthly summary. This cache keeps
+a typed, one-file-per-column copy of each table:
+
+    COLUMN_CACHE_DIR/<table>/meta.json
+    COLUMN_CACHE_DIR/<table>/<size>-<mtime_ns>/<column>.npy
+
+Numeric columns are float64 / int32 arrays. Text columns (sku, category,
+year, month, ...) are dictionary-encoded: int32 codes, with the distinct
+values listed in meta.json. An extra "_order" column groups the rows by
+(year, month), keeping file order within a month, so one month is a slice.
+
+A cache belongs to the CSV file's size and mtime: get() only returns columns
+for an unchanged file (memory-mapped, so opening them costs next to nothing)
+and refresh() rebuilds stale tables in one streamed pass over the CSV.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+from data_utils import atomic_write, file_signature, iter_csv_rows
+from profit_engine import to_float_array, to_int_array
+
+EBAY_SKU_CSV   = "ebay_sku.csv"
+EBAY_SALES_CSV = "ebay_sales.csv"
+WOO_SKU_CSV    = "woo_sku.csv"
+WOO_SALES_CSV  = "woo_sales.csv"
+
+COLUMN_CACHE_DIR = ".column_cache"
+META_JSON = "meta.json"
+ORDER_COLUMN = "_order"
+
+TEXT = "text"
+FLOAT64 = "float64"
+INT32 = "int32"
+
+SKU_COLUMNS = {
+    "month": TEXT, "year": TEXT, "sku": TEXT, "category": TEXT,
+    "sold_price_after_vat": FLOAT64, "sold_price_before_vat": FLOAT64,
+    "cost_of_item": FLOAT64, "packaging": TEXT,
+    "transaction_fee": FLOAT64, "delivery": FLOAT64,
+    "total_expenses": FLOAT64, "profit_margin": FLOAT64, "profit": FLOAT64,
+}
+SALES_COLUMNS = {"month": TEXT, "year": TEXT, "sku": TEXT, "units_sold": INT32}
+
+COLUMN_TYPES = {
+    EBAY_SKU_CSV:   SKU_COLUMNS,
+    EBAY_SALES_CSV: SALES_COLUMNS,
+    WOO_SKU_CSV:    SKU_COLUMNS,
+    WOO_SALES_CSV:  SALES_COLUMNS,
+}
+
+
+class ColumnTable:
+    """One table's cached columns; arrays are read-only memory maps, loaded on first use."""
+
+    def __init__(self, column_dir, meta):
+        self.column_dir = column_dir
+        self.rows = meta["rows"]
+        self.types = meta["types"]
+        self.values = meta["values"]   # text column -> [distinct value, ...] (index = code)
+        self._months = {tuple(k.split("-", 1)): v for k, v in meta["months"].items()}
+        self._columns = {}
+        self._codes = {}
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = np.load(os.path.join(self.column_dir, name + ".npy"), mmap_mode="r")
+        return self._columns[name]
+
+    def code_of(self, name):
+        """{value -> code} for a text column."""
+        if name not in self._codes:
+            self._codes[name] = {v: i for i, v in enumerate(self.values[name])}
+        return self._codes[name]
+
+    def month_rows(self, year, month):
+        """Row numbers of one (year, month), in file order."""
+        start, count = self._months.get((str(year), str(month)), (0, 0))
+        return np.asarray(self.column(ORDER_COLUMN)[start:start + count])
+
+    def months(self):
+        return list(self._months)
+
+
+class ColumnCache:
+    def __init__(self, cache_dir=COLUMN_CACHE_DIR, column_types=COLUMN_TYPES):
+        self.cache_dir = cache_dir
+        self.column_types = column_types
+        self._tables = {}   # filepath -> (signature, ColumnTable)
+
+    def _table_dir(self, filepath):
+        return os.path.join(self.cache_dir, os.path.splitext(os.path.basename(filepath))[0])
+
+    def _read_meta(self, filepath):
+        try:
+            with open(os.path.join(self._table_dir(filepath), META_JSON), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # --------------------------------------------------
+    # Lookup
+    # --------------------------------------------------
+    def get(self, filepath):
+        """The cached columns of `filepath` if they match the file as it is now, else None."""
+        signature = file_signature(filepath)
+        if signature is None:
+            return None
+        cached = self._tables.get(filepath)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        meta = self._read_meta(filepath)
+        if meta is None or meta["source"] != signature:
+            self._tables.pop(filepath, None)
+            return None
+        table = ColumnTable(os.path.join(self._table_dir(filepath), meta["dir"]), meta)
+        self._tables[filepath] = (signature, table)
+        return table
+
+    def is_fresh(self, filepath):
+        meta = self._read_meta(filepath)
+        return meta is not None and meta["source"] == file_signature(filepath)
+
+    # --------------------------------------------------
+    # Build
+    # --------------------------------------------------
+    def refresh(self, filepaths=None):
+        """Rebuild the cache of every stale table (default: all of COLUMN_TYPES). Returns those rebuilt."""
+        rebuilt = []
+        for filepath in filepaths or list(self.column_types):
+            if os.path.isfile(filepath) and not self.is_fresh(filepath):
+                self.build(filepath)
+                rebuilt.append(filepath)
+        return rebuilt
+
+    def build(self, filepath):
+        signature = file_signature(filepath)   # taken first: a write during the build leaves it stale
+        types = self.column_types[filepath]
+        names = list(types)
+        rows = list(iter_csv_rows(filepath, names))
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+
+        arrays = {}
+        values = {}
+        for name, col in zip(names, columns):
+            col = ["" if v is None else v for v in col]
+            if types[name] == FLOAT64:
+                arrays[name] = to_float_array(col)
+            elif types[name] == INT32:
+                arrays[name] = to_int_array(col).astype(np.int32)
+            else:
+                codes = {}
+                arrays[name] = np.fromiter((codes.setdefault(v, len(codes)) for v in col), dtype=np.int32, count=len(col))
+                values[name] = list(codes)
+
+        # group the rows by (year, month); the stable sort keeps file order inside a month
+        month_key = arrays["year"].astype(np.int64) * max(1, len(values["month"])) + arrays["month"]
+        order = np.argsort(month_key, kind="stable").astype(np.int32)
+        keys, starts, counts = np.unique(month_key[order], return_index=True, return_counts=True)
+        months = {}
+        for key, start, count in zip(keys.tolist(), starts.tolist(), counts.tolist()):
+            year, month = divmod(key, max(1, len(values["month"])))
+            months[f"{values['year'][year]}-{values['month'][month]}"] = [start, count]
+        arrays[ORDER_COLUMN] = order
+
+        # A new directory per file version: arrays of the old one may still be memory-mapped
+        table_dir = self._table_dir(filepath)
+        version = f"{signature[0]}-{signature[1]}"
+        column_dir = os.path.join(table_dir, version)
+        os.makedirs(column_dir, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(column_dir, name + ".npy"), array)
+
+        meta = {
+            "source": signature, "dir": version, "rows": len(rows),
+            "types": types, "values": values, "months": months,
+        }
+        with atomic_write(os.path.join(table_dir, META_JSON)) as f:
+            json.dump(meta, f, separators=(",", ":"))
+
+        self._tables.pop(filepath, None)
+        for name in os.listdir(table_dir):
+            if name not in (version, META_JSON) and os.path.isdir(os.path.join(table_dir, name)):
+                shutil.rmtree(os.path.join(table_dir, name), ignore_errors=True)
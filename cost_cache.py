@@ -0,0 +1,43 @@
+"""
+Per-(year, month) cost lookups for the SKU tabs.
+
+cost_data() builds the { cost_name -> float(cost_value) } dict for a month once
+from the costs table, and packaging_cost() remembers every packaging string
+already resolved against it. Both are dropped for the months the costs table
+reports as written (adding, deleting or carrying over costs), so recalculating
+hundreds of SKUs needs one pass over the month's costs rather than one per SKU.
+"""
+from data_utils import parse_packaging_input
+
+COSTS_CSV = "costs_data.csv"
+
+
+class CostCache:
+    def __init__(self, store):
+        self.store = store
+        self._costs = {}       # (year, month) -> { cost_name -> float }
+        self._packaging = {}   # (year, month) -> { packaging_str -> float }
+        store.table(COSTS_CSV).add_listener(self.invalidate)
+
+    def invalidate(self, filepath, months):
+        """Data store listener: forget the cost dicts (and resolved packaging) for `months`."""
+        for key in months:
+            self._costs.pop(key, None)
+            self._packaging.pop(key, None)
+
+    def cost_data(self, year, month):
+        key = (str(year), str(month))
+        if key not in self._costs:
+            cost_data = {}
+            for row in self.store.table(COSTS_CSV).month_rows(*key):
+                cost_data[row["cost_name"]] = float(row["cost_value"])
+            self._costs[key] = cost_data
+        return self._costs[key]
+
+    def packaging_cost(self, packaging_str, year, month):
+        """parse_packaging_input() against the month's costs, memoised per month."""
+        key = (str(year), str(month))
+        resolved = self._packaging.setdefault(key, {})
+        if packaging_str not in resolved:
+            resolved[packaging_str] = parse_packaging_input(packaging_str, self.cost_data(*key))
+        return resolved[packaging_str]
@@ -4,8 +4,8 @@ import customtkinter as ctk
 from datetime import datetime
 
 # Local imports from your own modules:
-from data_utils import read_csv_dicts, overwrite_csv_dicts
-from month_status import is_month_archived
+from month_status import is_month_archived, set_month_archived
+from rollover import roll_over
 
 COSTS_CSV = "costs_data.csv"
 
@@ -116,9 +116,10 @@ class CostsTab:
     def _mark_month_done_callback(self):
         m = self.costs_month_var.get()
         y = self.costs_year_var.get()
-        from .month_status import set_month_archived
-        set_month_archived(y, m, archived=True)
-        messagebox.showinfo("Month Archived", f"Marked {m}/{y} as DONE.")
+        self.app.io.submit(
+            lambda: set_month_archived(y, m, archived=True),
+            on_done=lambda _: messagebox.showinfo("Month Archived", f"Marked {m}/{y} as DONE.")
+        )
 
     def _carry_over_callback(self):
         m = self.costs_month_var.get()
@@ -127,21 +128,14 @@ class CostsTab:
             messagebox.showerror("Error", f"{m}/{y} is archived. Cannot carry over data.")
             return
 
-        # Example if you want to carry over from previous month:
-        from .month_status import get_previous_month_year
-        from .data_utils import carry_over_data_for_tab
-
-        carry_over_data_for_tab(
-            COSTS_CSV,
-            ["month","year","cost_name","cost_value"],
-            y, m,
-            key_fields=["cost_name"],
-            read_csv_fn=read_csv_dicts,
-            overwrite_csv_fn=overwrite_csv_dicts,
-            get_previous_month_year_fn=get_previous_month_year
-        )
-        messagebox.showinfo("Success", f"Carried over cost data into {m}/{y}.")
-        self.refresh_costs_table()
+        def job():
+            return roll_over(self.app.store, [(y, m)], [COSTS_CSV])["counts"][COSTS_CSV]
+
+        def done(carried):
+            messagebox.showinfo("Success", f"Carried over cost data into {m}/{y}.\n{carried} rows added.")
+            self.refresh_costs_table()
+
+        self.app.io.submit(job, on_done=done)
 
     # --------------------------------------------------
     # Add / Update Cost
@@ -163,27 +157,26 @@ class CostsTab:
         except ValueError:
             cost_value = 0.0
 
-        fieldnames = ["month", "year", "cost_name", "cost_value"]
-        existing = read_csv_dicts(COSTS_CSV)
-
-        found = False
-        for row in existing:
-            if (row["month"] == month and row["year"] == year and row["cost_name"] == cost_name):
-                row["cost_value"] = str(cost_value)
-                found = True
-                break
-        if not found:
-            new_row = {
+        def job():
+            costs_table = self.app.store.table(COSTS_CSV)
+            costs_table.upsert({
                 "month": month,
                 "year": year,
                 "cost_name": cost_name,
                 "cost_value": str(cost_value)
-            }
-            existing.append(new_row)
+            })
+            costs_table.save()
+            # SKUs using this cost in their packaging were repriced by the save (see repricing)
+            return sum(self.app.repricing.last_repriced.values())
+
+        def done(repriced):
+            msg = f"Cost '{cost_name}' updated for {month}/{year}."
+            if repriced:
+                msg += f"\n{repriced} SKU(s) using it were repriced."
+            messagebox.showinfo("Success", msg)
+            self.refresh_costs_table()
 
-        overwrite_csv_dicts(COSTS_CSV, fieldnames, existing)
-        messagebox.showinfo("Success", f"Cost '{cost_name}' updated for {month}/{year}.")
-        self.refresh_costs_table()
+        self.app.io.submit(job, on_done=done)
 
     # --------------------------------------------------
     # Refresh
@@ -191,17 +184,21 @@ class CostsTab:
     def refresh_costs_table(self, *args):
         month = self.costs_month_var.get()
         year = self.costs_year_var.get()
-        data = read_csv_dicts(COSTS_CSV)
+        self.app.io.submit(
+            lambda: list(self.app.store.table(COSTS_CSV).month_rows(year, month)),
+            on_done=self._render_costs_table,
+            channel="costs_table"
+        )
 
+    def _render_costs_table(self, data):
         # clear old
         for row in self.costs_tree.get_children():
             self.costs_tree.delete(row)
 
         for row in data:
-            if row["month"] == month and row["year"] == year:
-                cost_name  = row["cost_name"]
-                cost_value = row["cost_value"]
-                self.costs_tree.insert("", tk.END, values=(cost_name, "£" + cost_value))
+            cost_name  = row["cost_name"]
+            cost_value = row["cost_value"]
+            self.costs_tree.insert("", tk.END, values=(cost_name, "£" + cost_value))
 
     def edit_selected_cost(self):
         selection = self.costs_tree.selection()
@@ -241,19 +238,22 @@ class CostsTab:
             return
         cost_name = vals[0]
 
-        data = read_csv_dicts(COSTS_CSV)
-        new_data = []
-        removed = 0
-        for row in data:
-            if row["month"] == month and row["year"] == year and row["cost_name"] == cost_name:
-                removed += 1
+        def job():
+            costs_table = self.app.store.table(COSTS_CSV)
+            removed = costs_table.remove_where(lambda row: row["cost_name"] == cost_name, year, month)
+            if removed > 0:
+                costs_table.save()
+            return removed, sum(self.app.repricing.last_repriced.values())
+
+        def done(result):
+            removed, repriced = result
+            if removed > 0:
+                msg = f"Cost '{cost_name}' deleted for {month}/{year}."
+                if repriced:
+                    msg += f"\n{repriced} SKU(s) using it were repriced."
+                messagebox.showinfo("Success", msg)
+                self.refresh_costs_table()
             else:
-                new_data.append(row)
+                messagebox.showinfo("Info", f"No matching cost '{cost_name}' found for this month/year.")
 
-        if removed > 0:
-            fieldnames = ["month","year","cost_name","cost_value"]
-            overwrite_csv_dicts(COSTS_CSV, fieldnames, new_data)
-            messagebox.showinfo("Success", f"Cost '{cost_name}' deleted for {month}/{year}.")
-            self.refresh_costs_table()
-        else:
-            messagebox.showinfo("Info", f"No matching cost '{cost_name}' found for this month/year.")
+        self.app.io.submit(job, on_done=done)
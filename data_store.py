@@ -0,0 +1,243 @@
+from data_utils import (
+    read_csv_dicts,
+    write_csv_changes,
+    bulk_upsert_dicts
+)
+
+
+class Table:
+    """
+    One CSV file held in memory.
+
+    Rows are kept in file order in `rows`, plus two hash indexes:
+      (year, month)      -> [row, ...]
+      (year, month, key) -> row   (first row wins, like the old linear scans)
+
+    Edits are tracked until save(), so a storage backend with row-level writes
+    (see sqlite_backend) only persists the rows that actually changed, and
+    listeners are told which (year, month) pairs were written.
+
+    With a record_type (see records.make_record_type) rows are stored as those
+    compact records instead of dicts.
+    """
+
+    def __init__(self, filepath, fieldnames, key_field, record_type=None):
+        self.filepath = filepath
+        self.fieldnames = fieldnames
+        self.key_field = key_field
+        self.record_type = record_type
+        self._make_row = record_type or dict
+        self.rows = []
+        self._by_month = {}
+        self._by_key = {}
+        self._changed = {}      # (year, month, key) -> row
+        self._deleted = set()   # (year, month, key)
+        self._touched = set()   # (year, month) edited since the last save()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """callback(filepath, months) is called whenever (year, month) pairs are written or reloaded."""
+        self._listeners.append(callback)
+
+    def _notify(self, months):
+        for callback in self._listeners:
+            callback(self.filepath, months)
+
+    def load(self):
+        old_months = set(self._by_month)
+        self._read()
+        months = old_months | set(self._by_month)
+        if months:
+            self._notify(months)
+
+    def _read(self):
+        """Replace the rows with what storage holds, dropping any unsaved edits."""
+        self.rows = read_csv_dicts(self.filepath)
+        if self.record_type is not None:
+            self.rows = [self.record_type(r) for r in self.rows]
+        self._reindex()
+        self._clear_changes()
+        self._touched = set()
+
+    def save(self):
+        """
+        Persist the edits made since the last save. If storage refuses the write
+        (e.g. an archived, read-only month), the edits are dropped: the table is
+        reloaded from what storage holds, listeners are told about the months
+        that had edits, and the error is raised.
+        """
+        try:
+            if self._changed or self._deleted:
+                write_csv_changes(
+                    self.filepath, self.fieldnames, self.rows,
+                    list(self._changed.values()), list(self._deleted)
+                )
+        except Exception:
+            # only the edited months can differ from what storage holds
+            months = self._touched
+            self._read()
+            if months:
+                self._notify(months)
+            raise
+        self._clear_changes()
+        months, self._touched = self._touched, set()
+        if months:
+            self._notify(months)
+
+    def _clear_changes(self):
+        self._changed = {}
+        self._deleted = set()
+
+    def _row_key(self, row):
+        return (row["year"], row["month"], row[self.key_field])
+
+    def _mark_changed(self, row):
+        key = self._row_key(row)
+        self._deleted.discard(key)
+        self._changed[key] = row
+        self._touched.add(key[:2])
+
+    def _mark_deleted(self, row):
+        key = self._row_key(row)
+        self._changed.pop(key, None)
+        self._deleted.add(key)
+        self._touched.add(key[:2])
+
+    def _reindex(self):
+        self._by_month = {}
+        self._by_key = {}
+        for row in self.rows:
+            self._index_row(row)
+
+    def _index_row(self, row):
+        month_key = (row["year"], row["month"])
+        self._by_month.setdefault(month_key, []).append(row)
+        self._by_key.setdefault(month_key + (row[self.key_field],), row)
+
+    # --------------------------------------------------
+    # Lookups
+    # --------------------------------------------------
+    def month_rows(self, year, month):
+        """All rows for one (year, month), in file order."""
+        return self._by_month.get((str(year), str(month)), [])
+
+    def get(self, year, month, key):
+        """The row for (year, month, key), or None."""
+        return self._by_key.get((str(year), str(month), key))
+
+    def months(self):
+        """All (year, month) pairs present in the table."""
+        return list(self._by_month.keys())
+
+    # --------------------------------------------------
+    # Mutations (call save() afterwards to persist)
+    # --------------------------------------------------
+    def upsert(self, row):
+        """
+        Insert `row`, or update the existing row with the same (year, month, key).
+        Returns True if a new row was inserted.
+        """
+        existing = self.get(row["year"], row["month"], row[self.key_field])
+        if existing is not None:
+            existing.update(row)
+            self._mark_changed(existing)
+            return False
+        row = self._make_row(row)
+        self.rows.append(row)
+        self._index_row(row)
+        self._mark_changed(row)
+        return True
+
+    def bulk_upsert(self, rows):
+        """
+        Upsert a whole batch through the (year, month, key) index in one pass.
+        Returns { "inserted": n, "updated": n, "duplicates": n }.
+        """
+        def on_write(row, inserted):
+            if inserted:
+                self._index_row(row)
+            self._mark_changed(row)
+
+        return bulk_upsert_dicts(
+            self.rows, rows, ["year", "month", self.key_field],
+            index=self._by_key, on_write=on_write, make_row=self._make_row
+        )
+
+    def remove_where(self, predicate, year=None, month=None):
+        """
+        Remove every row for which predicate(row) is true. Returns the count.
+        With year and month, only that month's rows are tested (through the month index).
+        """
+        if year is not None:
+            return self._remove_in_month((str(year), str(month)), predicate)
+        kept = []
+        removed = 0
+        for row in self.rows:
+            if predicate(row):
+                self._mark_deleted(row)
+                removed += 1
+            else:
+                kept.append(row)
+        if removed:
+            self.rows = kept
+            self._reindex()
+        return removed
+
+    def _remove_in_month(self, month_key, predicate):
+        month_rows = self._by_month.get(month_key, [])
+        doomed = {id(row): row for row in month_rows if predicate(row)}
+        if not doomed:
+            return 0
+        for row in doomed.values():
+            self._mark_deleted(row)
+        self.rows = [row for row in self.rows if id(row) not in doomed]
+        # only this month's index entries change
+        del self._by_month[month_key]
+        for row in month_rows:
+            self._by_key.pop(month_key + (row[self.key_field],), None)
+        for row in month_rows:
+            if id(row) not in doomed:
+                self._index_row(row)
+        return len(doomed)
+
+    def update_where(self, predicate, changes):
+        """Apply `changes` to every row for which predicate(row) is true. Returns the count."""
+        changed = 0
+        for row in self.rows:
+            if predicate(row):
+                self._mark_deleted(row)
+                row.update(changes)
+                self._mark_changed(row)
+                changed += 1
+        if changed and {"year", "month", self.key_field} & set(changes):
+            self._reindex()
+        return changed
+
+class DataStore:
+    """
+    Shared in-memory copy of all CSV tables, loaded once by the app.
+    Tables are looked up by their CSV path (e.g. "ebay_sku.csv").
+
+    Once the UI is running, tables are only read and written from jobs on the
+    app's I/O worker thread (see io_worker), never directly from Tk callbacks.
+    """
+
+    def __init__(self):
+        self.tables = {}
+
+    def add_table(self, filepath, fieldnames, key_field, record_type=None):
+        table = Table(filepath, fieldnames, key_field, record_type)
+        table.load()
+        self.tables[filepath] = table
+        return table
+
+    def table(self, filepath):
+        return self.tables[filepath]
+
+    def add_listener(self, callback):
+        """Register callback(filepath, months) on every table (see Table.add_listener)."""
+        for table in self.tables.values():
+            table.add_listener(callback)
+
+    def reload(self, filepath):
+        self.tables[filepath].load()
@@ -1,11 +1,90 @@
 import csv
+import json
 import os
+import shutil
+from contextlib import contextmanager
+from functools import lru_cache
+
+
+# Optional alternative storage (e.g. sqlite_backend.SqliteBackend).
+# When None, the helpers below work directly on the CSV files.
+_storage_backend = None
+
+# Rolling "<file>.bak1" (newest) .. "<file>.bakN" copies kept by write_csv_file.
+_backup_count = 0
+
+TMP_SUFFIX = ".tmp"
+
+
+def set_storage_backend(backend):
+    """Route the read/write helpers below through `backend` (None = plain CSV files)."""
+    global _storage_backend
+    _storage_backend = backend
+
+
+def get_storage_backend():
+    return _storage_backend
+
+
+def file_signature(path):
+    """[size, mtime_ns] of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def storage_signature(filepath):
+    """
+    A JSON-able value that changes whenever the table stored for `filepath` is
+    written, from this process or any other. Backends that keep a table somewhere
+    else than its CSV file provide signature(filepath); otherwise it is the file's.
+    """
+    if _storage_backend is not None and hasattr(_storage_backend, "signature"):
+        return _storage_backend.signature(filepath)
+    return file_signature(filepath)
+
+
+def read_json_cache(path, filepaths):
+    """
+    Read a cache saved by write_json_cache. Returns (saved, stale): the saved dict
+    ({} if missing or unreadable) and the set of `filepaths` whose storage was
+    written since, by this process or another, i.e. whose cached values are suspect.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return {}, set(filepaths)
+    sources = saved.get("sources", {})
+    return saved, {f for f in filepaths if sources.get(f) != storage_signature(f)}
+
+
+def write_json_cache(path, filepaths, data):
+    """Save the dict `data` as JSON, with the current storage signature of each of `filepaths`."""
+    saved = dict(data, sources={f: storage_signature(f) for f in filepaths})
+    with atomic_write(path) as f:
+        json.dump(saved, f)
+
+
+def set_backup_count(count):
+    """Keep `count` previous versions of each CSV file on every full rewrite (0 = none)."""
+    global _backup_count
+    _backup_count = count
+
+
+def get_backup_count():
+    return _backup_count
 
 
 def ensure_csv_headers(filepath, headers):
     """Ensure that a CSV file exists with the given headers.
        If it doesn't exist, create it and write headers.
     """
+    if _storage_backend is not None:
+        _storage_backend.ensure_table(filepath, headers)
+        return
     if not os.path.isfile(filepath):
         with open(filepath, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
@@ -14,6 +93,52 @@ def ensure_csv_headers(filepath, headers):
 
 def read_csv_dicts(filepath):
     """Reads a CSV into a list of dicts."""
+    if _storage_backend is not None:
+        return _storage_backend.read_dicts(filepath)
+    return read_csv_file(filepath)
+
+
+def append_csv_dict(filepath, fieldnames, row_dict):
+    """Append a single dict to CSV."""
+    if _storage_backend is not None:
+        _storage_backend.upsert_dicts(filepath, fieldnames, [row_dict])
+        return
+    append_csv_file(filepath, fieldnames, [row_dict])
+
+
+def overwrite_csv_dicts(filepath, fieldnames, data):
+    """Overwrite CSV with a list of dictionaries."""
+    if _storage_backend is not None:
+        _storage_backend.overwrite_dicts(filepath, fieldnames, data)
+        return
+    write_csv_file(filepath, fieldnames, data)
+
+
+def period_key(year, month):
+    """Sort key for a (year, month) pair: numeric where possible, text otherwise."""
+    try:
+        return (0, int(year), int(month))
+    except ValueError:
+        return (1, str(year), str(month))
+
+
+def write_csv_changes(filepath, fieldnames, all_rows, changed_rows, deleted_keys):
+    """
+    Persist a batch of edits to one table.
+    A storage backend writes only `changed_rows` and deletes `deleted_keys`
+    (primary-key tuples); plain CSV files are rewritten in full from `all_rows`.
+    """
+    if _storage_backend is not None:
+        if deleted_keys:
+            _storage_backend.delete_keys(filepath, deleted_keys)
+        if changed_rows:
+            _storage_backend.upsert_dicts(filepath, fieldnames, changed_rows)
+        return
+    write_csv_file(filepath, fieldnames, all_rows)
+
+
+def read_csv_file(filepath):
+    """Reads the CSV file itself into a list of dicts, ignoring any storage backend."""
     if not os.path.isfile(filepath):
         return []
     with open(filepath, "r", newline="", encoding="utf-8") as f:
@@ -21,22 +146,150 @@ def read_csv_dicts(filepath):
         return list(reader)
 
 
-def append_csv_dict(filepath, fieldnames, row_dict):
-    """Append a single dict to CSV."""
-    with open(filepath, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writerow(row_dict)
+def read_csv_header(filepath):
+    """The column names of the CSV file itself ([] if it is missing or empty)."""
+    if not os.path.isfile(filepath):
+        return []
+    with open(filepath, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
 
 
-def overwrite_csv_dicts(filepath, fieldnames, data):
-    """Overwrite CSV with a list of dictionaries."""
-    with open(filepath, "w", newline="", encoding="utf-8") as f:
+def iter_csv_rows(filepath, columns=None, year=None, month=None):
+    """
+    Streams the CSV file itself (ignoring any storage backend) one row at a time,
+    as tuples of `columns` (default: every column, in file order). With year and/or
+    month, other rows are skipped on the raw fields before any tuple is built, so
+    memory and work scale with the rows selected rather than the file.
+    Columns not in the file, or cut off a short (truncated) line, come back as None.
+    """
+    if not os.path.isfile(filepath):
+        return
+    with open(filepath, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        pos = {}
+        for i, name in enumerate(header):
+            pos.setdefault(name, i)
+        wanted = [pos.get(c) for c in columns] if columns is not None else list(range(len(header)))
+        filters = []
+        if year is not None:
+            filters.append((pos["year"], str(year)))
+        if month is not None:
+            filters.append((pos["month"], str(month)))
+
+        for row in reader:
+            if not row:
+                continue   # blank line, skipped like csv.DictReader does
+            n = len(row)
+            if any(i >= n or row[i] != value for i, value in filters):
+                continue
+            yield tuple(row[i] if i is not None and i < n else None for i in wanted)
+
+
+def write_csv_file(filepath, fieldnames, data):
+    """Overwrites the CSV file itself with a list of dicts, ignoring any storage backend."""
+    with atomic_write(filepath, backups=_backup_count) as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         for row_dict in data:
             writer.writerow(row_dict)
 
 
+@contextmanager
+def atomic_write(filepath, backups=0, binary=False):
+    """
+    Yields a temp file next to `filepath` to write into (text, or bytes with binary=True).
+    On success it is fsynced and renamed over `filepath` in one step, so a crash or a
+    concurrent reader only ever sees the old or the new complete file. With backups > 0
+    the previous version is kept as "<file>.bak1" (older ones shift up to "<file>.bak<backups>").
+    """
+    tmp_path = filepath + TMP_SUFFIX
+    if binary:
+        f = open(tmp_path, "wb")
+    else:
+        f = open(tmp_path, "w", newline="", encoding="utf-8")
+    try:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+    except BaseException:
+        f.close()
+        os.remove(tmp_path)
+        raise
+    f.close()
+
+    if backups > 0 and os.path.isfile(filepath):
+        for n in range(backups - 1, 0, -1):
+            older = f"{filepath}.bak{n}"
+            if os.path.isfile(older):
+                os.replace(older, f"{filepath}.bak{n + 1}")
+        # The backup is a second name for the current file (a copy where links are not
+        # supported); `filepath` itself is only ever swapped, never moved away
+        backup_tmp = f"{filepath}.bak1{TMP_SUFFIX}"
+        if os.path.lexists(backup_tmp):
+            os.remove(backup_tmp)
+        try:
+            os.link(filepath, backup_tmp)
+        except OSError:
+            shutil.copy2(filepath, backup_tmp)
+        os.replace(backup_tmp, f"{filepath}.bak1")
+    os.replace(tmp_path, filepath)
+    _fsync_dir(filepath)
+
+
+def _fsync_dir(filepath):
+    """Make the rename itself durable (POSIX only; a no-op where directories can't be opened)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(filepath)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def recover_csv_files(filepaths):
+    """
+    Startup check for saves interrupted by a crash. For each file:
+      - a leftover temp file is an unfinished write that may be incomplete (the file
+        is only swapped for it after a complete write): removed, as is a leftover
+        temp backup link
+      - a file that is missing or empty is restored from its newest backup
+    Returns a list of messages describing what was done.
+    """
+    messages = []
+    for filepath in filepaths:
+        tmp_path = filepath + TMP_SUFFIX
+        if os.path.isfile(tmp_path):
+            os.remove(tmp_path)
+            messages.append(f"{filepath}: discarded an unfinished save.")
+        backup_tmp = f"{filepath}.bak1{TMP_SUFFIX}"
+        if os.path.lexists(backup_tmp):
+            os.remove(backup_tmp)
+
+        missing = not os.path.isfile(filepath) or os.path.getsize(filepath) == 0
+        backup = f"{filepath}.bak1"
+        if missing and os.path.isfile(backup):
+            shutil.copy2(backup, filepath)
+            messages.append(f"{filepath}: restored from {backup}.")
+    return messages
+
+
+def append_csv_file(filepath, fieldnames, data):
+    """Appends dicts to the CSV file itself, ignoring any storage backend."""
+    with open(filepath, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        for row_dict in data:
+            writer.writerow(row_dict)
+        f.flush()
+        os.fsync(f.fileno())
+
+
 def packaging_cost(packaging_value):
     """
     Example placeholder. If you want to treat "Box S", etc. as different costs,
@@ -66,13 +319,10 @@ def parse_packaging_input(packaging_str, cost_data_for_month):
     if not packaging_str.strip():
         return 0.0
 
-    tokens = [t.strip() for t in packaging_str.split(",") if t.strip()]
-    for token in tokens:
-        # try numeric
-        try:
-            val = float(token)
+    for token, val in _tokenize_packaging(packaging_str):
+        if val is not None:
             total += val
-        except ValueError:
+        else:
             # if not numeric, see if it's in cost_data_for_month
             if token in cost_data_for_month:
                 total += cost_data_for_month[token]
@@ -82,38 +332,69 @@ def parse_packaging_input(packaging_str, cost_data_for_month):
     return total
 
 
-def carry_over_data_for_tab(csv_file, fieldnames, year, month, key_fields, read_csv_fn, overwrite_csv_fn, get_previous_month_year_fn):
-    """
-    Copies rows from (prev_year, prev_month) to (year, month)
-    if the same 'key_fields' combination is not already present for (year, month).
-    """
-    data = read_csv_fn(csv_file)
-    prev_year, prev_month = get_previous_month_year_fn(year, month)
-
-    # Collect previous-month rows
-    prev_rows = [r for r in data if r["year"] == str(prev_year) and r["month"] == str(prev_month)]
-    # Collect current-month rows
-    curr_rows = [r for r in data if r["year"] == str(year) and r["month"] == str(month)]
-
-    # We'll make sets of key combinations to see if it already exists
-    curr_key_set = set()
-    for r in curr_rows:
-        key_tuple = tuple(r[k] for k in key_fields)
-        curr_key_set.add(key_tuple)
-
-    # For each previous row, if that key combination not in current, copy it over
-    new_data = []
-    appended_any = False
-    for r in prev_rows:
-        key_tuple = tuple(r[k] for k in key_fields)
-        if key_tuple not in curr_key_set:
-            # We carry it over as a new row (but with updated month/year)
-            new_row = dict(r)
-            new_row["year"] = str(year)
-            new_row["month"] = str(month)
-            new_data.append(new_row)
-            appended_any = True
-
-    if appended_any:
-        data.extend(new_data)
-        overwrite_csv_fn(csv_file, fieldnames, data)
+@lru_cache(maxsize=4096)
+def _tokenize_packaging(packaging_str):
+    """
+    'Box S, 0.30' -> (("Box S", None), ("0.30", 0.3)); memoised, since the same few
+    packaging strings are shared by most SKUs.
+    """
+    tokens = []
+    for t in packaging_str.split(","):
+        token = t.strip()
+        if not token:
+            continue
+        # try numeric
+        try:
+            tokens.append((token, float(token)))
+        except ValueError:
+            tokens.append((token, None))
+    return tuple(tokens)
+
+
+def packaging_cost_names(packaging_str):
+    """The non-numeric tokens of a packaging string, i.e. the cost_names it references."""
+    return [token for token, val in _tokenize_packaging(packaging_str) if val is None]
+
+
+def bulk_upsert_dicts(existing, batch, key_fields, index=None, on_write=None, make_row=dict):
+    """
+    Merges `batch` into the `existing` list of dicts in a single pass.
+
+    Rows are matched on `key_fields` (e.g. ["year", "month", "sku"]) through one
+    hash index, so the cost is O(len(existing) + len(batch)) rather than a scan of
+    `existing` per batch row. If the same key appears more than once in the batch,
+    the last row wins (same as pasting the lines one after another).
+
+    index: optional prebuilt { key_tuple -> row } for `existing`; kept up to date.
+    on_write: optional callback(row, inserted) for every row written.
+    make_row: builds the stored row for an inserted batch row (default: a dict copy).
+
+    Returns { "inserted": n, "updated": n, "duplicates": n }.
+    """
+    if index is None:
+        index = {}
+        for row in existing:
+            index.setdefault(tuple(row[k] for k in key_fields), row)
+
+    stats = {"inserted": 0, "updated": 0, "duplicates": 0}
+    seen = set()
+    for new_row in batch:
+        key = tuple(new_row[k] for k in key_fields)
+        if key in seen:
+            stats["duplicates"] += 1
+        row = index.get(key)
+        if row is not None:
+            row.update(new_row)
+            if key not in seen:
+                stats["updated"] += 1
+            inserted = False
+        else:
+            row = make_row(new_row)
+            existing.append(row)
+            index[key] = row
+            stats["inserted"] += 1
+            inserted = True
+        seen.add(key)
+        if on_write is not None:
+            on_write(row, inserted)
+    return stats
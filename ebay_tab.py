@@ -4,13 +4,9 @@ import customtkinter as ctk
 from datetime import datetime
 
 # Local imports from your own modules:
-from data_utils import (
-    read_csv_dicts,
-    overwrite_csv_dicts,
-    parse_packaging_input,
-    carry_over_data_for_tab
-)
-from month_status import is_month_archived
+from month_status import is_month_archived, set_month_archived
+from rollover import roll_over
+from virtual_tree import VirtualTreeview
 
 # CSV references
 EBAY_SKU_CSV   = "ebay_sku.csv"
@@ -59,7 +55,8 @@ class EbayTab:
         self.ebay_month_cb = ctk.CTkComboBox(
             date_frame,
             values=[str(i) for i in range(1,13)],
-            variable=self.ebay_month_var
+            variable=self.ebay_month_var,
+            command=self._on_period_change
         )
         self.ebay_month_cb.grid(row=0, column=1, padx=5, pady=5)
 
@@ -68,7 +65,8 @@ class EbayTab:
         self.ebay_year_cb = ctk.CTkComboBox(
             date_frame,
             values=[str(y) for y in range(2020, datetime.now().year+3)],
-            variable=self.ebay_year_var
+            variable=self.ebay_year_var,
+            command=self._on_period_change
         )
         self.ebay_year_cb.grid(row=0, column=3, padx=5, pady=5)
 
@@ -194,15 +192,11 @@ class EbayTab:
             "cost_of_item", "packaging", "transaction_fee", "delivery",
             "total_expenses", "profit_margin", "profit"
         )
-        self.ebay_tree = ttk.Treeview(bottom_frame, columns=columns, show="headings", height=8)
+        self.ebay_tree = VirtualTreeview(bottom_frame, columns=columns, height=8)
         for col in columns:
             self.ebay_tree.heading(col, text=col)
             self.ebay_tree.column(col, width=120)
-
-        self.ebay_scrollbar = ttk.Scrollbar(bottom_frame, orient="vertical", command=self.ebay_tree.yview)
-        self.ebay_tree.configure(yscrollcommand=self.ebay_scrollbar.set)
-        self.ebay_tree.grid(row=1, column=0, columnspan=3, sticky="nsew")
-        self.ebay_scrollbar.grid(row=1, column=3, sticky="ns")
+        self.ebay_tree.grid(row=1, column=0, columnspan=4, sticky="nsew")
 
         bottom_frame.rowconfigure(1, weight=1)
         bottom_frame.columnconfigure(0, weight=1)
@@ -242,9 +236,10 @@ class EbayTab:
     def _mark_month_done_callback(self):
         m = self.ebay_month_var.get()
         y = self.ebay_year_var.get()
-        from .month_status import set_month_archived
-        set_month_archived(y, m, archived=True)
-        messagebox.showinfo("Month Archived", f"Marked {m}/{y} as DONE.")
+        self.app.io.submit(
+            lambda: set_month_archived(y, m, archived=True),
+            on_done=lambda _: messagebox.showinfo("Month Archived", f"Marked {m}/{y} as DONE.")
+        )
 
     def _carry_over_callback(self):
         m = self.ebay_month_var.get()
@@ -253,22 +248,18 @@ class EbayTab:
             messagebox.showerror("Error", f"{m}/{y} is archived. Cannot carry over.")
             return
 
-        from .month_status import get_previous_month_year
-        carry_over_data_for_tab(
-            EBAY_SKU_CSV,
-            [
-                "month","year","sku","category","sold_price_after_vat","sold_price_before_vat",
-                "cost_of_item","packaging","transaction_fee","delivery","total_expenses",
-                "profit_margin","profit"
-            ],
-            y, m,
-            key_fields=["sku"],
-            read_csv_fn=read_csv_dicts,
-            overwrite_csv_fn=overwrite_csv_dicts,
-            get_previous_month_year_fn=get_previous_month_year
-        )
-        # You might also carry over B2B_CSV, COSTS_CSV, etc. if you want.
-        messagebox.showinfo("Carry Over Complete", f"Data carried over into {m}/{y}.")
+        def job():
+            return roll_over(self.app.store, [(y, m)], [EBAY_SKU_CSV])["counts"][EBAY_SKU_CSV]
+
+        def done(carried):
+            messagebox.showinfo("Carry Over Complete", f"Data carried over into {m}/{y}.\n{carried} rows added.")
+            self.refresh_ebay_sku_table()
+            self.refresh_ebay_category_table()
+
+        self.app.io.submit(job, on_done=done)
+
+    def _on_period_change(self, *args):
+        # Rapid month/year changes: each refresh supersedes the previous one still in flight
         self.refresh_ebay_sku_table()
         self.refresh_ebay_category_table()
 
@@ -278,13 +269,12 @@ class EbayTab:
     def _select_packaging_costs_ebay(self):
         month = self.ebay_month_var.get()
         year = self.ebay_year_var.get()
-        data = read_csv_dicts(COSTS_CSV)
-        cost_names = []
-        for row in data:
-            if row["month"] == month and row["year"] == year:
-                cost_names.append(row["cost_name"])
-        cost_names = sorted(list(set(cost_names)))
+        self.app.io.submit(
+            lambda: sorted(set(row["cost_name"] for row in self.app.store.table(COSTS_CSV).month_rows(year, month))),
+            on_done=lambda cost_names: self._show_packaging_dialog_ebay(month, year, cost_names)
+        )
 
+    def _show_packaging_dialog_ebay(self, month, year, cost_names):
         top = tk.Toplevel()
         top.title("Select Packaging Costs (eBay)")
         tk.Label(top, text=f"Select Packaging Costs for {month}/{year}:").pack(pady=5)
@@ -351,48 +341,15 @@ class EbayTab:
 
         before_vat = round(after_vat / 1.2, 2) if after_vat != 0 else 0.0
 
-        # gather cost_data for packaging
-        cost_data = {}
-        for row in read_csv_dicts(COSTS_CSV):
-            if row["month"] == month and row["year"] == year:
-                cost_data[row["cost_name"]] = float(row["cost_value"])
-
-        packaging_sum = parse_packaging_input(packaging_str, cost_data)
-        total_expenses = cost + trans_fee + packaging_sum + delivery
-        profit = before_vat - total_expenses
-        profit_margin = (profit / before_vat)*100 if before_vat != 0 else 0.0
-
-        self.ebay_before_vat_var.set(f"£{before_vat:.2f}")
-        self.ebay_total_exp_var.set(f"£{total_expenses:.2f}")
-        self.ebay_margin_var.set(f"{profit_margin:.2f}")
-        self.ebay_profit_var.set(f"£{profit:.2f}")
-
-        fieldnames = [
-            "month", "year", "sku", "category",
-            "sold_price_after_vat", "sold_price_before_vat",
-            "cost_of_item", "packaging", "transaction_fee", "delivery",
-            "total_expenses", "profit_margin", "profit"
-        ]
-        existing = read_csv_dicts(EBAY_SKU_CSV)
-
-        found = False
-        for row in existing:
-            if (row["month"] == month and row["year"] == year and row["sku"] == sku):
-                row["category"] = category
-                row["sold_price_after_vat"] = f"{after_vat:.2f}"
-                row["sold_price_before_vat"] = f"{before_vat:.2f}"
-                row["cost_of_item"] = f"{cost:.2f}"
-                row["packaging"]    = packaging_str
-                row["transaction_fee"] = f"{trans_fee:.2f}"
-                row["delivery"]     = f"{delivery:.2f}"
-                row["total_expenses"] = f"{total_expenses:.2f}"
-                row["profit_margin"] = f"{profit_margin:.2f}"
-                row["profit"]        = f"{profit:.2f}"
-                found = True
-                break
-
-        if not found:
-            new_row = {
+        def job():
+            # month's costs and resolved packaging strings are cached (see cost_cache)
+            packaging_sum = self.app.cost_cache.packaging_cost(packaging_str, year, month)
+            total_expenses = cost + trans_fee + packaging_sum + delivery
+            profit = before_vat - total_expenses
+            profit_margin = (profit / before_vat)*100 if before_vat != 0 else 0.0
+
+            sku_table = self.app.store.table(EBAY_SKU_CSV)
+            sku_table.upsert({
                 "month": month,
                 "year": year,
                 "sku": sku,
@@ -406,12 +363,20 @@ class EbayTab:
                 "total_expenses": f"{total_expenses:.2f}",
                 "profit_margin": f"{profit_margin:.2f}",
                 "profit": f"{profit:.2f}"
-            }
-            existing.append(new_row)
+            })
+            sku_table.save()
+            return total_expenses, profit_margin, profit
+
+        def done(result):
+            total_expenses, profit_margin, profit = result
+            self.ebay_before_vat_var.set(f"£{before_vat:.2f}")
+            self.ebay_total_exp_var.set(f"£{total_expenses:.2f}")
+            self.ebay_margin_var.set(f"{profit_margin:.2f}")
+            self.ebay_profit_var.set(f"£{profit:.2f}")
+            messagebox.showinfo("Success", f"SKU '{sku}' saved/updated for {month}/{year}.")
+            self.refresh_ebay_sku_table()
 
-        overwrite_csv_dicts(EBAY_SKU_CSV, fieldnames, existing)
-        messagebox.showinfo("Success", f"SKU '{sku}' saved/updated for {month}/{year}.")
-        self.refresh_ebay_sku_table()
+        self.app.io.submit(job, on_done=done)
 
     # --------------------------------------------------
     # MASS SALES
@@ -427,10 +392,7 @@ class EbayTab:
         sku_lines   = self.ebay_sales_skus_text.get("1.0", "end").strip().splitlines()
         units_lines = self.ebay_sales_units_text.get("1.0", "end").strip().splitlines()
 
-        fieldnames = ["month", "year", "sku", "units_sold"]
-        existing = read_csv_dicts(EBAY_SALES_CSV)
-
-        count = 0
+        batch = []
         for i in range(min(len(sku_lines), len(units_lines))):
             sku = sku_lines[i].strip()
             if not sku:
@@ -440,84 +402,86 @@ class EbayTab:
             except ValueError:
                 units_sold = 0
 
-            found = False
-            for row in existing:
-                if (row["month"] == month and row["year"] == year and row["sku"] == sku):
-                    row["units_sold"] = str(units_sold)
-                    found = True
-                    break
-            if not found:
-                new_row = {
-                    "month": month,
-                    "year": year,
-                    "sku": sku,
-                    "units_sold": str(units_sold)
-                }
-                existing.append(new_row)
-            count += 1
-
-        overwrite_csv_dicts(EBAY_SALES_CSV, fieldnames, existing)
-        messagebox.showinfo("Success", f"Mass Sales Updated: {count} entries processed.")
+            batch.append({
+                "month": month,
+                "year": year,
+                "sku": sku,
+                "units_sold": str(units_sold)
+            })
+
+        def job():
+            sales_table = self.app.store.table(EBAY_SALES_CSV)
+            stats = sales_table.bulk_upsert(batch)
+            sales_table.save()
+            return stats
+
+        def done(stats):
+            messagebox.showinfo(
+                "Success",
+                f"Mass Sales Updated: {len(batch)} entries processed "
+                f"({stats['inserted']} new, {stats['updated']} updated, "
+                f"{stats['duplicates']} duplicate SKUs in paste)."
+            )
+
+        self.app.io.submit(job, on_done=done)
 
     def show_ebay_sales_report(self):
         month = self.ebay_month_var.get()
         year  = self.ebay_year_var.get()
-        self.ebay_sales_report_text.delete("0.0", "end")
-
-        sku_data   = read_csv_dicts(EBAY_SKU_CSV)
-        sales_data = read_csv_dicts(EBAY_SALES_CSV)
+        self.app.io.submit(
+            lambda: self._build_ebay_sales_report(month, year),
+            on_done=self._render_ebay_sales_report,
+            channel="ebay_report"
+        )
 
-        profit_dict = {}
-        for row in sku_data:
-            if row["month"] == month and row["year"] == year:
-                sku = row["sku"]
-                try:
-                    profit_per_item = float(row["profit"])
-                except ValueError:
-                    profit_per_item = 0.0
-                profit_dict[sku] = profit_per_item
+    def _build_ebay_sales_report(self, month, year):
+        # Archived months come from their frozen snapshot (see month_snapshots)
+        report = self.app.snapshots.sales_report("ebay", year, month)
 
-        total_profit = 0.0
+        total_profit = report["total"]
         report_lines = [f"--- eBay Sales Report for {month}/{year} ---"]
 
-        for row in sales_data:
-            if row["month"] == month and row["year"] == year:
-                sku = row["sku"]
-                try:
-                    units_sold = int(row["units_sold"])
-                except ValueError:
-                    units_sold = 0
-                if sku in profit_dict:
-                    line_profit = profit_dict[sku] * units_sold
-                    total_profit += line_profit
-                    report_lines.append(
-                        f"SKU: {sku}, Units Sold: {units_sold}, Profit/item: £{profit_dict[sku]:.2f}, "
-                        f"Line Profit: £{line_profit:.2f}"
-                    )
-                else:
-                    report_lines.append(
-                        f"SKU: {sku}, Units Sold: {units_sold}, [No matching SKU data found]"
-                    )
+        for sku, units_sold, profit_per_item, line_profit in report["lines"]:
+            if profit_per_item is not None:
+                report_lines.append(
+                    f"SKU: {sku}, Units Sold: {units_sold}, Profit/item: £{profit_per_item:.2f}, "
+                    f"Line Profit: £{line_profit:.2f}"
+                )
+            else:
+                report_lines.append(
+                    f"SKU: {sku}, Units Sold: {units_sold}, [No matching SKU data found]"
+                )
+
+        category_totals = report["categories"]
+        if category_totals:
+            report_lines.append("Profit by Category:")
+            for cat in sorted(category_totals):
+                report_lines.append(f"  {cat or '(none)'}: £{category_totals[cat]:.2f}")
 
         report_lines.append(f"Total eBay Profit for {month}/{year}: £{total_profit:.2f}")
+        return report_lines
+
+    def _render_ebay_sales_report(self, report_lines):
+        self.ebay_sales_report_text.delete("0.0", "end")
         self.ebay_sales_report_text.insert("0.0", "\n".join(report_lines) + "\n")
 
     # --------------------------------------------------
     # Refresh
     # --------------------------------------------------
     def refresh_ebay_sku_table(self, *args):
-        for row in self.ebay_tree.get_children():
-            self.ebay_tree.delete(row)
-
         chosen_month = self.ebay_month_var.get()
         chosen_year  = self.ebay_year_var.get()
-        data = read_csv_dicts(EBAY_SKU_CSV)
+        self.app.io.submit(
+            lambda: list(self.app.store.table(EBAY_SKU_CSV).month_rows(chosen_year, chosen_month)),
+            on_done=self._render_ebay_sku_table,
+            channel="ebay_sku_table"
+        )
 
+    def _render_ebay_sku_table(self, data):
         # gather categories
         cat_set = set()
         for r in data:
-            if r["month"] == chosen_month and r["year"] == chosen_year:
-                cat_set.add(r["category"])
+            cat_set.add(r["category"])
 
         cat_list = ["All"] + sorted(cat_set)
         current_vals = self.ebay_filter_cb.cget("values")
@@ -527,40 +491,47 @@ class EbayTab:
                 self.ebay_filter_var.set("All")
 
         chosen_cat = self.ebay_filter_var.get()
+        rows = []
         for r in data:
-            if r["month"] == chosen_month and r["year"] == chosen_year:
-                if chosen_cat == "All" or r["category"] == chosen_cat:
-                    vals = (
-                        r["sku"],
-                        r["category"],
-                        "£"+r["sold_price_after_vat"],
-                        "£"+r["sold_price_before_vat"],
-                        "£"+r["cost_of_item"],
-                        r["packaging"],
-                        "£"+r["transaction_fee"],
-                        "£"+r["delivery"],
-                        "£"+r["total_expenses"],
-                        r["profit_margin"],
-                        "£"+r["profit"]
-                    )
-                    self.ebay_tree.insert("", tk.END, values=vals)
+            if chosen_cat == "All" or r["category"] == chosen_cat:
+                vals = (
+                    r["sku"],
+                    r["category"],
+                    "£"+r["sold_price_after_vat"],
+                    "£"+r["sold_price_before_vat"],
+                    "£"+r["cost_of_item"],
+                    r["packaging"],
+                    "£"+r["transaction_fee"],
+                    "£"+r["delivery"],
+                    "£"+r["total_expenses"],
+                    r["profit_margin"],
+                    "£"+r["profit"]
+                )
+                rows.append((r["sku"], vals))
+        # Only the visible window is materialised; rows are diffed by SKU
+        self.ebay_tree.set_rows(rows)
 
     def refresh_ebay_category_table(self):
+        chosen_month = self.ebay_month_var.get()
+        chosen_year  = self.ebay_year_var.get()
+        self.app.io.submit(
+            lambda: list(self.app.store.table(EBAY_SKU_CSV).month_rows(chosen_year, chosen_month)),
+            on_done=self._render_ebay_category_table,
+            channel="ebay_category_table"
+        )
+
+    def _render_ebay_category_table(self, data):
         for row in self.ebay_cat_tree.get_children():
             self.ebay_cat_tree.delete(row)
 
-        chosen_month = self.ebay_month_var.get()
-        chosen_year  = self.ebay_year_var.get()
-        data = read_csv_dicts(EBAY_SKU_CSV)
         cat_map = {}
         for r in data:
-            if r["month"] == chosen_month and r["year"] == chosen_year:
-                cat = r["category"]
-                sku = r["sku"]
-                if cat not in cat_map:
-                    cat_map[cat] = []
-                if sku not in cat_map[cat]:
-                    cat_map[cat].append(sku)
+            cat = r["category"]
+            sku = r["sku"]
+            if cat not in cat_map:
+                cat_map[cat] = []
+            if sku not in cat_map[cat]:
+                cat_map[cat].append(sku)
 
         for cat in sorted(cat_map.keys()):
             sku_list = ", ".join(sorted(cat_map[cat]))
@@ -578,28 +549,37 @@ class EbayTab:
         chosen_sku = vals[0]
         chosen_category = vals[1].replace("£","")
 
-        data = read_csv_dicts(EBAY_SKU_CSV)
-        for row in data:
-            if row["sku"] == chosen_sku and row["category"] == chosen_category:
-                self.ebay_sku_entry.delete(0, tk.END)
-                self.ebay_sku_entry.insert(0, row["sku"])
-                self.ebay_price_after_vat_entry.delete(0, tk.END)
-                self.ebay_price_after_vat_entry.insert(0, row["sold_price_after_vat"])
-                self.ebay_cost_entry.delete(0, tk.END)
-                self.ebay_cost_entry.insert(0, row["cost_of_item"])
-                self.ebay_packaging_var.set(row["packaging"])
-                self.ebay_trans_fee_entry.delete(0, tk.END)
-                self.ebay_trans_fee_entry.insert(0, "0")
-                self.ebay_trans_fee_flat_entry.delete(0, tk.END)
-                self.ebay_trans_fee_flat_entry.insert(0, row["transaction_fee"])
-                self.ebay_delivery_entry.delete(0, tk.END)
-                self.ebay_delivery_entry.insert(0, row["delivery"])
-                self.ebay_category_entry.delete(0, tk.END)
-                self.ebay_category_entry.insert(0, row["category"])
-                self.ebay_month_var.set(row["month"])
-                self.ebay_year_var.set(row["year"])
+        def done(row):
+            if row is not None:
+                self._fill_ebay_form(row)
                 messagebox.showinfo("Info", f"SKU '{chosen_sku}' loaded for editing.")
-                break
+
+        self.app.io.submit(lambda: self._find_ebay_row(chosen_sku, chosen_category), on_done=done)
+
+    def _find_ebay_row(self, sku, category):
+        for row in self.app.store.table(EBAY_SKU_CSV).rows:
+            if row["sku"] == sku and row["category"] == category:
+                return dict(row)
+        return None
+
+    def _fill_ebay_form(self, row):
+        self.ebay_sku_entry.delete(0, tk.END)
+        self.ebay_sku_entry.insert(0, row["sku"])
+        self.ebay_price_after_vat_entry.delete(0, tk.END)
+        self.ebay_price_after_vat_entry.insert(0, row["sold_price_after_vat"])
+        self.ebay_cost_entry.delete(0, tk.END)
+        self.ebay_cost_entry.insert(0, row["cost_of_item"])
+        self.ebay_packaging_var.set(row["packaging"])
+        self.ebay_trans_fee_entry.delete(0, tk.END)
+        self.ebay_trans_fee_entry.insert(0, "0")
+        self.ebay_trans_fee_flat_entry.delete(0, tk.END)
+        self.ebay_trans_fee_flat_entry.insert(0, row["transaction_fee"])
+        self.ebay_delivery_entry.delete(0, tk.END)
+        self.ebay_delivery_entry.insert(0, row["delivery"])
+        self.ebay_category_entry.delete(0, tk.END)
+        self.ebay_category_entry.insert(0, row["category"])
+        self.ebay_month_var.set(row["month"])
+        self.ebay_year_var.set(row["year"])
 
     # --------------------------------------------------
     # Category-based Edit/Delete/Move
@@ -628,30 +608,14 @@ class EbayTab:
         if not chosen_sku or chosen_sku not in sku_list:
             return
 
-        data = read_csv_dicts(EBAY_SKU_CSV)
-        for row in data:
-            if row["sku"] == chosen_sku and row["category"] == category:
+        def done(row):
+            if row is not None:
                 # same approach as 'edit_selected_ebay_sku'
-                self.ebay_sku_entry.delete(0, tk.END)
-                self.ebay_sku_entry.insert(0, row["sku"])
-                self.ebay_price_after_vat_entry.delete(0, tk.END)
-                self.ebay_price_after_vat_entry.insert(0, row["sold_price_after_vat"])
-                self.ebay_cost_entry.delete(0, tk.END)
-                self.ebay_cost_entry.insert(0, row["cost_of_item"])
-                self.ebay_packaging_var.set(row["packaging"])
-                self.ebay_trans_fee_entry.delete(0, tk.END)
-                self.ebay_trans_fee_entry.insert(0, "0")
-                self.ebay_trans_fee_flat_entry.delete(0, tk.END)
-                self.ebay_trans_fee_flat_entry.insert(0, row["transaction_fee"])
-                self.ebay_delivery_entry.delete(0, tk.END)
-                self.ebay_delivery_entry.insert(0, row["delivery"])
-                self.ebay_category_entry.delete(0, tk.END)
-                self.ebay_category_entry.insert(0, row["category"])
-                self.ebay_month_var.set(row["month"])
-                self.ebay_year_var.set(row["year"])
+                self._fill_ebay_form(row)
                 self.add_ebay_sku()  # actually update
                 messagebox.showinfo("Info", f"SKU '{chosen_sku}' loaded for editing.")
-                break
+
+        self.app.io.submit(lambda: self._find_ebay_row(chosen_sku, category), on_done=done)
 
     def delete_ebay_sku_in_category(self):
         selection = self.ebay_cat_tree.selection()
@@ -677,29 +641,25 @@ class EbayTab:
         if not chosen_sku or chosen_sku not in sku_list:
             return
 
-        data = read_csv_dicts(EBAY_SKU_CSV)
-        new_data = []
-        deleted_count = 0
-        for row in data:
-            if row["sku"] == chosen_sku and row["category"] == category:
-                deleted_count += 1
+        def job():
+            sku_table = self.app.store.table(EBAY_SKU_CSV)
+            deleted_count = sku_table.remove_where(
+                lambda row: row["sku"] == chosen_sku and row["category"] == category
+                and not is_month_archived(row["year"], row["month"])
+            )
+            if deleted_count > 0:
+                sku_table.save()
+            return deleted_count
+
+        def done(deleted_count):
+            if deleted_count > 0:
+                messagebox.showinfo("Success", f"SKU '{chosen_sku}' deleted successfully.")
+                self.refresh_ebay_category_table()
+                self.refresh_ebay_sku_table()
             else:
-                new_data.append(row)
-
-        if deleted_count > 0:
-            fieldnames = [
-                "month", "year", "sku", "category",
-                "sold_price_after_vat", "sold_price_before_vat",
-                "cost_of_item", "packaging",
-                "transaction_fee", "delivery",
-                "total_expenses", "profit_margin", "profit"
-            ]
-            overwrite_csv_dicts(EBAY_SKU_CSV, fieldnames, new_data)
-            messagebox.showinfo("Success", f"SKU '{chosen_sku}' deleted successfully.")
-            self.refresh_ebay_category_table()
-            self.refresh_ebay_sku_table()
-        else:
-            messagebox.showinfo("Info", f"SKU '{chosen_sku}' not found for deletion.")
+                messagebox.showinfo("Info", f"SKU '{chosen_sku}' not found for deletion.")
+
+        self.app.io.submit(job, on_done=done)
 
     def move_ebay_sku_category(self):
         selection = self.ebay_cat_tree.selection()
@@ -728,22 +688,23 @@ class EbayTab:
         if not new_cat:
             return
 
-        data = read_csv_dicts(EBAY_SKU_CSV)
-        changed = 0
-        for row in data:
-            if row["sku"] == chosen_sku and row["category"] == old_category:
-                row["category"] = new_cat
-                changed += 1
-
-        if changed:
-            fieldnames = [
-                "month","year","sku","category","sold_price_after_vat","sold_price_before_vat",
-                "cost_of_item","packaging","transaction_fee","delivery","total_expenses",
-                "profit_margin","profit"
-            ]
-            overwrite_csv_dicts(EBAY_SKU_CSV, fieldnames, data)
-            messagebox.showinfo("Success", f"Moved SKU '{chosen_sku}' to category '{new_cat}'.")
-            self.refresh_ebay_category_table()
-            self.refresh_ebay_sku_table()
-        else:
-            messagebox.showinfo("Info", "No matching SKU found to move.")
+        def job():
+            sku_table = self.app.store.table(EBAY_SKU_CSV)
+            changed = sku_table.update_where(
+                lambda row: row["sku"] == chosen_sku and row["category"] == old_category
+                and not is_month_archived(row["year"], row["month"]),
+                {"category": new_cat}
+            )
+            if changed:
+                sku_table.save()
+            return changed
+
+        def done(changed):
+            if changed:
+                messagebox.showinfo("Success", f"Moved SKU '{chosen_sku}' to category '{new_cat}'.")
+                self.refresh_ebay_category_table()
+                self.refresh_ebay_sku_table()
+            else:
+                messagebox.showinfo("Info", "No matching SKU found to move.")
+
+        self.app.io.submit(job, on_done=done)
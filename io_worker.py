@@ -0,0 +1,97 @@
+"""
+Background worker for data access, so the Tk mainloop never blocks on file I/O.
+
+Tabs submit jobs (load/compute/save functions) with submit(); the jobs run one at
+a time on a single worker thread, which also keeps every data store access in
+one thread. Results are queued and handed back on the Tk thread by a poll loop
+driven by root.after(), where the on_done callback renders them.
+
+Jobs submitted on the same `channel` (e.g. "ebay_sku_table") supersede each
+other: when the month/year changes quickly only the latest refresh delivers
+its result, and older ones still waiting in the queue are skipped unrun.
+"""
+import queue
+import threading
+import traceback
+
+POLL_MS = 50
+
+
+class IOWorker:
+    def __init__(self, root, on_error=None, poll_ms=POLL_MS):
+        """
+        root: Tk widget used for after() polling
+        on_error: default callback(exception) on the Tk thread for failed jobs
+        """
+        self.root = root
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._generations = {}   # channel -> latest generation submitted
+        self._pending = 0
+        self._busy = False
+        self._busy_listeners = []
+
+        self._thread = threading.Thread(target=self._run, name="io-worker", daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def add_busy_listener(self, callback):
+        """callback(busy: bool) on the Tk thread whenever the worker starts/stops having work."""
+        self._busy_listeners.append(callback)
+
+    def submit(self, job, on_done=None, on_error=None, channel=None):
+        """
+        Run job() on the worker thread, then on_done(result) on the Tk thread.
+        A newer submit() on the same `channel` makes this one stale: it is skipped
+        if not started yet, and its result is dropped otherwise.
+        Must be called from the Tk thread.
+        """
+        generation = None
+        if channel is not None:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+        self._pending += 1
+        self._set_busy(True)
+        self._jobs.put((job, on_done, on_error, channel, generation))
+
+    def _is_stale(self, channel, generation):
+        return channel is not None and self._generations.get(channel) != generation
+
+    def _run(self):
+        while True:
+            job, on_done, on_error, channel, generation = self._jobs.get()
+            if self._is_stale(channel, generation):
+                self._results.put((None, None, channel, generation))
+                continue
+            try:
+                result = job()
+            except Exception as exc:
+                traceback.print_exc()
+                self._results.put((on_error or self.on_error, exc, channel, generation))
+            else:
+                self._results.put((on_done, result, channel, generation))
+
+    def _poll(self):
+        try:
+            while True:
+                callback, value, channel, generation = self._results.get_nowait()
+                self._pending -= 1
+                if callback is not None and not self._is_stale(channel, generation):
+                    try:
+                        callback(value)
+                    except Exception:
+                        traceback.print_exc()
+        except queue.Empty:
+            pass
+        if self._pending == 0:
+            self._set_busy(False)
+        self.root.after(self.poll_ms, self._poll)
+
+    def _set_busy(self, busy):
+        if busy == self._busy:
+            return
+        self._busy = busy
+        for callback in self._busy_listeners:
+            callback(busy)
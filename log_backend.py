@@ -0,0 +1,179 @@
+"""
+Append-only (log-structured) storage for the profit tracker tables.
+
+The CSV file itself stays a plain snapshot. Every edit is appended to a
+sidecar log ("ebay_sku.csv.log") as one line with a sequence number and an
+operation marker ("U" = upsert, "D" = delete tombstone), so the cost of a save
+does not depend on how much history the table holds. Reads replay the log over
+the snapshot (last writer wins), and once the log grows past `compact_threshold`
+lines it is folded back into the CSV and removed.
+
+Enable it with data_utils.set_storage_backend(LogCsvBackend(...)).
+"""
+import csv
+import os
+
+from data_utils import file_signature, read_csv_file, write_csv_file, append_csv_file
+
+LOG_SUFFIX = ".log"
+SEQ_FIELD = "_seq"
+OP_FIELD = "_op"
+OP_UPSERT = "U"
+OP_DELETE = "D"
+
+
+class LogCsvBackend:
+    def __init__(self, primary_keys, compact_threshold=1000):
+        """
+        primary_keys: { csv_filepath -> ("year", "month", "sku"), ... }
+        compact_threshold: log lines allowed before a table is compacted
+        """
+        self.primary_keys = primary_keys
+        self.compact_threshold = compact_threshold
+        self._fieldnames = {}
+        self._log_lengths = {}   # filepath -> (lines in log, last sequence number)
+
+    def _log_path(self, filepath):
+        return filepath + LOG_SUFFIX
+
+    def _key(self, filepath, row):
+        return tuple(row.get(k, "") for k in self.primary_keys[filepath])
+
+    def _fieldnames_for(self, filepath):
+        if filepath not in self._fieldnames and os.path.isfile(filepath):
+            with open(filepath, "r", newline="", encoding="utf-8") as f:
+                self._fieldnames[filepath] = next(csv.reader(f), [])
+        return self._fieldnames.get(filepath, [])
+
+    def _log_entries(self, filepath):
+        """
+        (header, entries, end) of the table's log: the complete entries as lists of
+        fields, and the byte offset just past the last complete line. A line cut
+        short by a crash mid-append (no trailing newline, an unclosed quote or the
+        wrong number of fields) is left out.
+        """
+        header, entries, end = [], [], 0
+        log_path = self._log_path(filepath)
+        if not os.path.isfile(log_path):
+            return header, entries, end
+        with open(log_path, "rb") as f:
+            lines = iter(f)
+            for line in lines:
+                # a quoted field may span lines: keep reading until the quotes balance
+                while line.count(b'"') % 2:
+                    more = next(lines, b"")
+                    if not more:
+                        break
+                    line += more
+                if not line.endswith(b"\n") or line.count(b'"') % 2:
+                    break   # only the last line can be cut short
+                end += len(line)
+                if not line.strip():
+                    continue
+                fields = next(csv.reader([line.decode("utf-8")]), [])
+                if not header:
+                    header = fields
+                elif len(fields) == len(header):
+                    entries.append(fields)
+        return header, entries, end
+
+    def _log_length(self, filepath):
+        if filepath not in self._log_lengths:
+            _, entries, end = self._log_entries(filepath)
+            log_path = self._log_path(filepath)
+            if os.path.isfile(log_path) and os.path.getsize(log_path) > end:
+                # drop a line cut short by a crash, so the next entry starts on a line of its own
+                with open(log_path, "r+b") as f:
+                    f.truncate(end)
+            last_seq = int(entries[-1][0]) if entries else 0   # _seq is the first log column
+            self._log_lengths[filepath] = (len(entries), last_seq)
+        return self._log_lengths[filepath]
+
+    # --------------------------------------------------
+    # Storage backend interface (see data_utils)
+    # --------------------------------------------------
+    def ensure_table(self, filepath, headers):
+        self._fieldnames[filepath] = list(headers)
+        if not os.path.isfile(filepath):
+            write_csv_file(filepath, headers, [])
+
+    def read_dicts(self, filepath):
+        rows = {}
+        for row in read_csv_file(filepath):
+            rows.setdefault(self._key(filepath, row), row)
+        header, entries, _ = self._log_entries(filepath)
+        for fields in entries:
+            entry = dict(zip(header, fields))
+            op = entry.pop(OP_FIELD)
+            entry.pop(SEQ_FIELD)
+            key = self._key(filepath, entry)
+            if op == OP_DELETE:
+                rows.pop(key, None)
+            elif key in rows:
+                rows[key].update(entry)
+            else:
+                rows[key] = entry
+        return list(rows.values())
+
+    def overwrite_dicts(self, filepath, fieldnames, data):
+        self._fieldnames[filepath] = list(fieldnames)
+        write_csv_file(filepath, fieldnames, data)
+        self._drop_log(filepath)
+
+    def upsert_dicts(self, filepath, fieldnames, rows):
+        self._append(filepath, OP_UPSERT, rows)
+
+    def delete_keys(self, filepath, keys):
+        pk = self.primary_keys[filepath]
+        self._append(filepath, OP_DELETE, [dict(zip(pk, key)) for key in keys])
+
+    # --------------------------------------------------
+    # Log handling
+    # --------------------------------------------------
+    def _append(self, filepath, op, rows):
+        if not rows:
+            return
+        log_path = self._log_path(filepath)
+        log_fields = [SEQ_FIELD, OP_FIELD] + self._fieldnames_for(filepath)
+        length, seq = self._log_length(filepath)
+        if not os.path.isfile(log_path) or not os.path.getsize(log_path):
+            write_csv_file(log_path, log_fields, [])
+
+        entries = []
+        for row in rows:
+            seq += 1
+            entry = {f: row.get(f, "") for f in log_fields[2:]}
+            entry[SEQ_FIELD] = str(seq)
+            entry[OP_FIELD] = op
+            entries.append(entry)
+        try:
+            append_csv_file(log_path, log_fields, entries)
+        except BaseException:
+            # the log may now end in a partial line: find and drop it before the next append
+            self._log_lengths.pop(filepath, None)
+            raise
+        self._log_lengths[filepath] = (length + len(entries), seq)
+
+        if length + len(entries) > self.compact_threshold:
+            self.compact(filepath)
+
+    def compact(self, filepath):
+        """Fold the log into the CSV snapshot and remove it."""
+        rows = self.read_dicts(filepath)
+        write_csv_file(filepath, self._fieldnames_for(filepath), rows)
+        self._drop_log(filepath)
+
+    def signature(self, filepath):
+        """The table is its CSV file plus its log."""
+        return [file_signature(filepath), file_signature(self._log_path(filepath))]
+
+    def compact_all(self):
+        for filepath in self.primary_keys:
+            if os.path.isfile(self._log_path(filepath)):
+                self.compact(filepath)
+
+    def _drop_log(self, filepath):
+        log_path = self._log_path(filepath)
+        if os.path.isfile(log_path):
+            os.remove(log_path)
+        self._log_lengths[filepath] = (0, 0)
@@ -0,0 +1,118 @@
+"""
+Frozen, precomputed results for archived months.
+
+When a month is marked as done (month_status.set_month_archived), its data can
+no longer change, so everything the reports need is computed once and written
+to SNAPSHOT_DIR/<year>-<month>.json:
+
+    {"channels": {
+        "ebay": {"total": float,
+                 "categories": {category: float},
+                 "lines": [[sku, units_sold, profit_per_item or null, line_profit], ...]},
+        "woo":  {...},
+        "b2b":  {"profit": float, "expense": float, "lines": int}}}
+
+Sales reports and the monthly summary read the snapshot instead of the raw
+rows. Un-archiving a month deletes its snapshot. Months archived before
+snapshots existed are materialised the first time they are asked for.
+"""
+import json
+import os
+
+from data_utils import atomic_write
+from month_status import add_archive_listener, is_month_archived
+from profit_engine import to_float_array
+
+B2B_CSV = "b2b_data.csv"
+
+SNAPSHOT_DIR = "snapshots"
+
+
+def sales_report(block):
+    """Per-line profits, per-category totals and the total for one channel's MonthBlock."""
+    lines = []
+    for i, sku in enumerate(block.sales_skus):
+        idx = block.sales_sku_idx[i]
+        profit_per_item = float(block.sku_profit[idx]) if idx >= 0 else None
+        lines.append([sku, int(block.units[i]), profit_per_item, float(block.line_profit[i])])
+    return {
+        "total": block.total_profit(),
+        "categories": block.category_totals(),
+        "lines": lines,
+    }
+
+
+def b2b_totals(b2b_rows):
+    """Profit/expense sums and row count for one month's B2B rows."""
+    return {
+        "profit": float(to_float_array([r["profit"] for r in b2b_rows]).sum()),
+        "expense": float(to_float_array([r["expense"] for r in b2b_rows]).sum()),
+        "lines": len(b2b_rows),
+    }
+
+
+class MonthSnapshots:
+    def __init__(self, store, profit_engine, snapshot_dir=SNAPSHOT_DIR):
+        self.store = store
+        self.profit_engine = profit_engine
+        self.snapshot_dir = snapshot_dir
+        self._snapshots = {}   # (year, month) -> loaded snapshot
+        add_archive_listener(self.on_archive_changed)
+
+    def _path(self, year, month):
+        return os.path.join(self.snapshot_dir, f"{year}-{month}.json")
+
+    def on_archive_changed(self, year, month, archived):
+        """month_status listener: materialise on archive, drop on un-archive."""
+        if archived:
+            self.materialise(year, month)
+        else:
+            self.drop(year, month)
+
+    # --------------------------------------------------
+    # Build / drop
+    # --------------------------------------------------
+    def materialise(self, year, month):
+        key = (str(year), str(month))
+        channels = {
+            name: sales_report(engine.block(*key))
+            for name, engine in self.profit_engine.channels.items()
+        }
+        channels["b2b"] = b2b_totals(self.store.table(B2B_CSV).month_rows(*key))
+        snapshot = {"channels": channels}
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        with atomic_write(self._path(*key)) as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        self._snapshots[key] = snapshot
+        return snapshot
+
+    def drop(self, year, month):
+        key = (str(year), str(month))
+        self._snapshots.pop(key, None)
+        path = self._path(*key)
+        if os.path.isfile(path):
+            os.remove(path)
+
+    # --------------------------------------------------
+    # Lookup
+    # --------------------------------------------------
+    def get(self, year, month):
+        """The month's snapshot if it is archived (building it if missing), else None."""
+        key = (str(year), str(month))
+        if not is_month_archived(*key):
+            return None
+        if key not in self._snapshots:
+            try:
+                with open(self._path(*key), "r", encoding="utf-8") as f:
+                    self._snapshots[key] = json.load(f)
+            except (OSError, ValueError):
+                return self.materialise(*key)
+        return self._snapshots[key]
+
+    def sales_report(self, channel, year, month):
+        """sales_report() for `channel` ("ebay"/"woo"), from the snapshot when the month is archived."""
+        snapshot = self.get(year, month)
+        if snapshot is not None:
+            return snapshot["channels"][channel]
+        return sales_report(self.profit_engine.channel(channel).block(year, month))
@@ -1,34 +1,69 @@
 from data_utils import ensure_csv_headers, read_csv_dicts, overwrite_csv_dicts
 
 MONTH_STATUS_CSV = "month_status.csv"
+MONTH_STATUS_FIELDNAMES = ["year", "month", "archived"]
 
 
 def ensure_month_status_csv():
-    ensure_csv_headers(MONTH_STATUS_CSV, ["year", "month", "archived"])
+    ensure_csv_headers(MONTH_STATUS_CSV, MONTH_STATUS_FIELDNAMES)
+
+
+# In-process registry, loaded from MONTH_STATUS_CSV on first use:
+#   _rows      - the file's rows, in file order (what gets persisted)
+#   _by_month  - (year, month) -> row   (first row wins, like the old linear scan)
+#   _archived  - {(year, month), ...} currently archived
+_rows = None
+_by_month = {}
+_archived = set()
+_archive_listeners = []
+
+
+def _load_registry():
+    global _rows, _by_month, _archived
+    if _rows is None:
+        rows = read_csv_dicts(MONTH_STATUS_CSV)
+        by_month = {}
+        for r in rows:
+            by_month.setdefault((r["year"], r["month"]), r)
+        _by_month = by_month
+        _archived = {key for key, r in by_month.items() if r["archived"] == "True"}
+        _rows = rows
+
+
+def add_archive_listener(callback):
+    """callback(year, month, archived) is called after set_month_archived() has persisted a change."""
+    _archive_listeners.append(callback)
 
 
 def is_month_archived(year, month):
     """Check if given year,month is archived (done)."""
-    rows = read_csv_dicts(MONTH_STATUS_CSV)
-    for r in rows:
-        if r["year"] == str(year) and r["month"] == str(month):
-            return (r["archived"] == "True")
-    return False
+    _load_registry()
+    return (str(year), str(month)) in _archived
+
+
+def archived_months():
+    """Set of (year, month) string pairs that are archived."""
+    _load_registry()
+    return set(_archived)
 
 
 def set_month_archived(year, month, archived=True):
     """Mark a month as archived or not."""
-    fieldnames = ["year", "month", "archived"]
-    rows = read_csv_dicts(MONTH_STATUS_CSV)
-    found = False
-    for r in rows:
-        if r["year"] == str(year) and r["month"] == str(month):
-            r["archived"] = str(archived)
-            found = True
-            break
-    if not found:
-        rows.append({"year": str(year), "month": str(month), "archived": str(archived)})
-    overwrite_csv_dicts(MONTH_STATUS_CSV, fieldnames, rows)
+    _load_registry()
+    key = (str(year), str(month))
+    r = _by_month.get(key)
+    if r is None:
+        r = {"year": key[0], "month": key[1]}
+        _rows.append(r)
+        _by_month[key] = r
+    r["archived"] = str(archived)
+    if archived:
+        _archived.add(key)
+    else:
+        _archived.discard(key)
+    overwrite_csv_dicts(MONTH_STATUS_CSV, MONTH_STATUS_FIELDNAMES, _rows)
+    for callback in _archive_listeners:
+        callback(key[0], key[1], bool(archived))
 
 
 def get_previous_month_year(year, month):
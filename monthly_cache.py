@@ -0,0 +1,158 @@
+"""
+Persistent per-(year, month) profit/expense totals for the Summary tab.
+
+Totals are kept per channel (ebay, woo, b2b) in MONTHLY_CACHE_JSON. When a tab
+saves, the data store reports which (year, month) pairs it wrote and only those
+months are dropped from the cache, so generating a summary or chart only
+recomputes the months that changed since last time. Archived months are frozen:
+once cached they are never invalidated or recomputed. Tables written outside
+the app (the CLI, a hand-edited partition) are caught on load by comparing
+each table's storage signature with the one saved next to the totals. When at least
+PARALLEL_MIN_MONTHS live months are missing at once, they are computed by the
+report engine's worker processes instead (see report_engine).
+
+Dropping or computing months only marks the cache unsaved; the JSON file is
+written once, when the app closes (see App._on_close). A session that ends
+without saving leaves the file with its old signatures, so the months it held
+are checked again on the next load like any other write outside the app.
+"""
+from data_utils import read_json_cache, write_json_cache
+from month_status import archived_months
+from month_snapshots import b2b_totals
+
+EBAY_SKU_CSV   = "ebay_sku.csv"
+EBAY_SALES_CSV = "ebay_sales.csv"
+WOO_SKU_CSV    = "woo_sku.csv"
+WOO_SALES_CSV  = "woo_sales.csv"
+B2B_CSV        = "b2b_data.csv"
+
+MONTHLY_CACHE_JSON = "monthly_aggregates.json"
+
+# Fewer missing months than this are quicker to compute in-process than to hand to a pool
+PARALLEL_MIN_MONTHS = 12
+
+# Each cached channel entry is {"profit": float, "expense": float, "lines": int}, where
+# "lines" counts the sales/B2B rows that contributed (months with none report no data).
+# channel -> the tables its totals are computed from
+CHANNEL_SOURCES = {
+    "ebay": [EBAY_SKU_CSV, EBAY_SALES_CSV],
+    "woo":  [WOO_SKU_CSV, WOO_SALES_CSV],
+    "b2b":  [B2B_CSV],
+}
+SOURCE_FILES = [f for files in CHANNEL_SOURCES.values() for f in files]
+
+
+class MonthlyAggregateCache:
+    def __init__(self, store, profit_engine, snapshots=None, cache_path=MONTHLY_CACHE_JSON, report_engine=None):
+        self.store = store
+        self.profit_engine = profit_engine
+        self.snapshots = snapshots
+        self.report_engine = report_engine
+        self.cache_path = cache_path
+        # (year, month) -> { channel -> {"profit": float, "expense": float, "lines": int} }
+        self.months = {}
+        self._unsaved = False   # months or table signatures changed since the file was written
+        self._load()
+        for filepath in SOURCE_FILES:
+            store.table(filepath).add_listener(self.invalidate)
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+    def _load(self):
+        saved, stale_files = read_json_cache(self.cache_path, SOURCE_FILES)
+        # A channel whose tables were written outside the app loses its totals,
+        # except in frozen months; months left incomplete are recomputed.
+        stale = {channel for channel, files in CHANNEL_SOURCES.items() if stale_files.intersection(files)}
+        archived = archived_months()
+        for key_str, channels in saved.get("months", {}).items():
+            year, month = key_str.split("-")
+            if (year, month) not in archived:
+                channels = {c: totals for c, totals in channels.items() if c not in stale}
+            if channels:
+                self.months[(year, month)] = channels
+        self._unsaved = bool(stale)
+
+    def save(self):
+        """Write the cache file, if anything changed since it was last written."""
+        if not self._unsaved:
+            return
+        write_json_cache(self.cache_path, SOURCE_FILES, {
+            "months": {f"{y}-{m}": channels for (y, m), channels in self.months.items()},
+        })
+        self._unsaved = False
+
+    # --------------------------------------------------
+    # Invalidation / lookup
+    # --------------------------------------------------
+    def invalidate(self, filepath, months):
+        """Data store listener: drop the cached totals for `months`, unless archived."""
+        archived = archived_months()
+        for key in months:
+            if key in self.months and key not in archived:
+                del self.months[key]
+        self._unsaved = True
+
+    def monthly_totals(self):
+        """
+        Returns { (year, month) -> {"profit": float, "expense": float} } across all channels,
+        computing only the months that are not cached yet.
+        """
+        all_months = set()
+        for filepath in SOURCE_FILES:
+            all_months.update(self.store.table(filepath).months())
+
+        missing = [ym for ym in all_months if len(self.months.get(ym, ())) < len(CHANNEL_SOURCES)]
+        # archived months come from their snapshots below
+        archived = archived_months() if missing else set()
+        if self.report_engine is not None and len(missing) >= PARALLEL_MIN_MONTHS:
+            self.months.update(self.report_engine.compute_months([ym for ym in missing if ym not in archived]))
+        unarchived = [ym for ym in missing if ym not in archived and len(self.months.get(ym, ())) < len(CHANNEL_SOURCES)]
+        for engine in self.profit_engine.channels.values():
+            engine.prefetch(unarchived)
+        for (year, month) in missing:
+            if len(self.months.get((year, month), ())) < len(CHANNEL_SOURCES):
+                self.months[(year, month)] = self.compute_month(year, month)
+        if missing:
+            self._unsaved = True
+
+        totals = {}
+        for key, channels in self.months.items():
+            if key not in all_months or not any(c["lines"] for c in channels.values()):
+                continue
+            totals[key] = {
+                "profit":  sum(c["profit"] for c in channels.values()),
+                "expense": sum(c["expense"] for c in channels.values()),
+            }
+        return totals
+
+    def compute_month(self, year, month):
+        """
+        Per-channel profit/expense for one month: from the frozen snapshot if the
+        month is archived, otherwise via the profit engine and the B2B rows.
+        """
+        snapshot = self.snapshots.get(year, month) if self.snapshots else None
+        if snapshot is not None:
+            channels = {}
+            for channel, report in snapshot["channels"].items():
+                if channel == "b2b":
+                    channels[channel] = dict(report)
+                else:
+                    channels[channel] = {
+                        "profit": report["total"],
+                        "expense": 0.0,
+                        "lines": sum(1 for line in report["lines"] if line[2] is not None),
+                    }
+            return channels
+
+        channels = {}
+        for channel, engine in self.profit_engine.channels.items():
+            block = engine.block(year, month)
+            channels[channel] = {
+                "profit": block.total_profit(),
+                "expense": 0.0,
+                "lines": int(block.matched.sum()),
+            }
+
+        channels["b2b"] = b2b_totals(self.store.table(B2B_CSV).month_rows(year, month))
+        return channels
@@ -0,0 +1,198 @@
+"""
+Per-month partitioned storage for the profit tracker tables.
+
+Every table is split into one CSV file per month,
+
+    data/<table>/<year>-<month>.csv      e.g. data/ebay_sku/2024-6.csv
+
+each with its own header, so a save only rewrites the partitions of the
+months it touched and its cost no longer depends on how much history the
+table holds (carrying a month over writes just the new month's file).
+Partitions of archived months have their write permission removed and are
+refused by every write until the month is un-archived.
+
+The monolithic CSV files are split into partitions the first time a table
+is opened and are not written after that; export_csv_files() joins the
+partitions back into them.
+
+Enable it with data_utils.set_storage_backend(PartitionedCsvBackend(...)).
+"""
+import os
+import stat
+
+from data_utils import file_signature, period_key, read_csv_file, write_csv_file, TMP_SUFFIX
+
+PARTITION_DIR = "data"
+PARTITION_SUFFIX = ".csv"
+
+
+def _table_name(filepath):
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+class PartitionedCsvBackend:
+    def __init__(self, primary_keys, data_dir=PARTITION_DIR, locked_tables=None):
+        """
+        primary_keys: { csv_filepath -> ("year", "month", "sku"), ... }
+        data_dir: directory holding one sub-directory of partitions per table
+        locked_tables: tables whose archived months are made read-only (default: all)
+        """
+        self.primary_keys = primary_keys
+        self.data_dir = data_dir
+        self.locked_tables = list(primary_keys) if locked_tables is None else list(locked_tables)
+        self._fieldnames = {}
+
+    def _table_dir(self, filepath):
+        return os.path.join(self.data_dir, _table_name(filepath))
+
+    def _partition_path(self, filepath, year, month):
+        return os.path.join(self._table_dir(filepath), f"{year}-{month}{PARTITION_SUFFIX}")
+
+    def partitions(self, filepath):
+        """[(year, month), ...] with a partition on disk, oldest first."""
+        table_dir = self._table_dir(filepath)
+        if not os.path.isdir(table_dir):
+            return []
+        months = []
+        for name in os.listdir(table_dir):
+            if name.endswith(PARTITION_SUFFIX) and "-" in name:
+                year, month = name[:-len(PARTITION_SUFFIX)].split("-", 1)
+                months.append((year, month))
+        months.sort(key=lambda key: period_key(*key))
+        return months
+
+    def signature(self, filepath):
+        """[partitions, total bytes, newest mtime_ns]: changes with any write, removal or hand edit."""
+        sizes = []
+        newest = 0
+        for year, month in self.partitions(filepath):
+            sig = file_signature(self._partition_path(filepath, year, month))
+            if sig is not None:
+                sizes.append(sig[0])
+                newest = max(newest, sig[1])
+        return [len(sizes), sum(sizes), newest]
+
+    # --------------------------------------------------
+    # Partition files
+    # --------------------------------------------------
+    def _check_writable(self, filepath, months):
+        """Raise PermissionError if any of `months` has a read-only (archived) partition."""
+        for year, month in months:
+            path = self._partition_path(filepath, year, month)
+            if os.path.isfile(path) and not os.stat(path).st_mode & stat.S_IWUSR:
+                raise PermissionError(f"{path} belongs to an archived month and is read-only.")
+
+    def _write_partition(self, filepath, year, month, fieldnames, rows):
+        """Replace one month's partition (an empty `rows` removes it)."""
+        self._check_writable(filepath, [(year, month)])
+        path = self._partition_path(filepath, year, month)
+        if rows:
+            write_csv_file(path, fieldnames, rows)
+        elif os.path.isfile(path):
+            os.remove(path)
+
+    def set_month_locked(self, year, month, locked=True):
+        """Make (or stop making) every locked table's partition for the month read-only."""
+        for filepath in self.locked_tables:
+            path = self._partition_path(filepath, year, month)
+            if not os.path.isfile(path):
+                continue
+            mode = os.stat(path).st_mode
+            if locked:
+                mode &= ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+            else:
+                mode |= stat.S_IWUSR
+            os.chmod(path, mode)
+
+    def on_archive_changed(self, year, month, archived):
+        """month_status listener: archived months are read-only."""
+        self.set_month_locked(year, month, archived)
+
+    def _fieldnames_for(self, filepath):
+        return self._fieldnames.get(filepath) or []
+
+    # --------------------------------------------------
+    # Storage backend interface (see data_utils)
+    # --------------------------------------------------
+    def ensure_table(self, filepath, headers):
+        self._fieldnames[filepath] = list(headers)
+        table_dir = self._table_dir(filepath)
+        if os.path.isdir(table_dir):
+            # finish what a crash interrupted: temp files are only ever half-written saves
+            for name in os.listdir(table_dir):
+                if name.endswith(TMP_SUFFIX):
+                    os.remove(os.path.join(table_dir, name))
+            return
+        os.makedirs(table_dir)
+        # first use: split the monolithic CSV into partitions
+        by_month = {}
+        for row in read_csv_file(filepath):
+            by_month.setdefault((row["year"], row["month"]), []).append(row)
+        for (year, month), rows in by_month.items():
+            write_csv_file(self._partition_path(filepath, year, month), headers, rows)
+
+    def read_month(self, filepath, year, month):
+        """The rows of one (year, month), read from its partition only."""
+        return read_csv_file(self._partition_path(filepath, year, month))
+
+    def read_dicts(self, filepath):
+        rows = []
+        for year, month in self.partitions(filepath):
+            rows.extend(self.read_month(filepath, year, month))
+        return rows
+
+    def write_months(self, filepath, fieldnames, rows_by_month):
+        # all or nothing: a locked month refuses the save before any partition is written
+        self._check_writable(filepath, rows_by_month)
+        for (year, month), rows in rows_by_month.items():
+            self._write_partition(filepath, year, month, fieldnames, rows)
+
+    def overwrite_dicts(self, filepath, fieldnames, data):
+        by_month = {key: [] for key in self.partitions(filepath)}
+        for row in data:
+            by_month.setdefault((row["year"], row["month"]), []).append(row)
+        self.write_months(filepath, fieldnames, by_month)
+
+    def upsert_dicts(self, filepath, fieldnames, rows):
+        pk = self.primary_keys[filepath]
+        by_month = {}
+        for row in rows:
+            by_month.setdefault((row["year"], row["month"]), []).append(row)
+        self._check_writable(filepath, by_month)
+        for (year, month), month_rows in by_month.items():
+            existing = self.read_month(filepath, year, month)
+            by_key = {}
+            for row in existing:
+                by_key.setdefault(tuple(row.get(k, "") for k in pk), row)
+            for row in month_rows:
+                key = tuple(row.get(k, "") for k in pk)
+                if key in by_key:
+                    by_key[key].update(row)
+                else:
+                    by_key[key] = dict(row)
+                    existing.append(by_key[key])
+            self._write_partition(filepath, year, month, fieldnames, existing)
+
+    def delete_keys(self, filepath, keys):
+        """keys: iterable of primary-key tuples, in primary_keys[filepath] order."""
+        pk = self.primary_keys[filepath]
+        year_pos, month_pos = pk.index("year"), pk.index("month")
+        by_month = {}
+        for key in keys:
+            by_month.setdefault((key[year_pos], key[month_pos]), set()).add(tuple(key))
+        self._check_writable(filepath, by_month)
+        for (year, month), dead in by_month.items():
+            rows = self.read_month(filepath, year, month)
+            kept = [r for r in rows if tuple(r.get(k, "") for k in pk) not in dead]
+            if len(kept) != len(rows):
+                self._write_partition(filepath, year, month, self._fieldnames_for(filepath), kept)
+
+
+def export_csv_files(backend, headers_by_file):
+    """Join every table's partitions back into its monolithic CSV file (oldest month first)."""
+    counts = {}
+    for filepath, headers in headers_by_file.items():
+        rows = backend.read_dicts(filepath)
+        write_csv_file(filepath, headers, rows)
+        counts[filepath] = len(rows)
+    return counts
@@ -0,0 +1,283 @@
+"""
+Columnar profit calculations for the eBay and WooCommerce sales channels.
+
+For each (year, month) the SKU and sales rows are parsed once into typed NumPy
+arrays (a "month block"); line profit, monthly totals and per-category totals
+are then vectorised joins/group-bys over those arrays instead of per-row
+float()/int() parsing and dict lookups. Blocks are cached and dropped only for
+the months the data store reports as written. With a column cache (see
+column_cache) that matches the files, blocks are sliced from its typed arrays
+instead of being parsed from the row dicts. When many months are missing at
+once, the tables are turned into columns in one pass (TableColumns) and every
+block is sliced from those, instead of parsing each month's rows on their own.
+"""
+from itertools import chain, repeat
+from operator import attrgetter, itemgetter
+
+import numpy as np
+
+EBAY_SKU_CSV   = "ebay_sku.csv"
+EBAY_SALES_CSV = "ebay_sales.csv"
+WOO_SKU_CSV    = "woo_sku.csv"
+WOO_SALES_CSV  = "woo_sales.csv"
+
+# A cold build of more than this fraction of a channel's months converts whole tables at once
+BULK_BUILD_FRACTION = 0.25
+
+# channel -> (sku table, sales table)
+SALES_CHANNELS = {
+    "ebay": (EBAY_SKU_CSV, EBAY_SALES_CSV),
+    "woo":  (WOO_SKU_CSV, WOO_SALES_CSV),
+}
+
+# The columns a month block needs, for whole-table conversion (see TableColumns)
+SKU_COLUMN_TYPES   = {"sku": "text", "category": "text", "profit": "float64", "sold_price_before_vat": "float64"}
+SALES_COLUMN_TYPES = {"sku": "text", "units_sold": "int64"}
+
+
+def to_float_array(values):
+    """Strings -> float64 array; unparsable values become 0.0 (like the old try/except)."""
+    try:
+        return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+    except (TypeError, ValueError):
+        out = np.zeros(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                pass
+        return out
+
+
+def to_int_array(values):
+    """Strings -> int64 array; unparsable values become 0 (like the old try/except)."""
+    try:
+        return np.fromiter(map(int, values), dtype=np.int64, count=len(values))
+    except (TypeError, ValueError):
+        out = np.zeros(len(values), dtype=np.int64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = int(v)
+            except (TypeError, ValueError):
+                pass
+        return out
+
+
+class TableColumns:
+    """
+    A data store table's rows as in-memory columns, with the interface of
+    column_cache.ColumnTable (month_rows/column/values/code_of), so
+    MonthBlock.from_columns can slice any month from them. Text columns are
+    dictionary-encoded in order of first appearance; rows are grouped by month.
+    """
+
+    def __init__(self, table, types):
+        by_month = table._by_month
+        rows = list(chain.from_iterable(by_month.values()))
+        self._months = {}
+        start = 0
+        for key, month_rows in by_month.items():
+            self._months[key] = (start, len(month_rows))
+            start += len(month_rows)
+
+        # records (see records) have attributes; plain rows are dicts
+        getter = itemgetter if not rows or isinstance(rows[0], dict) else attrgetter
+        self._columns = {}
+        self.values = {}
+        self._codes = {}
+        for name in types:
+            col = list(map(getter(name), rows))
+            if types[name] == "float64":
+                self._columns[name] = to_float_array(col)
+            elif types[name] == "int64":
+                self._columns[name] = to_int_array(col)
+            else:
+                codes = {value: i for i, value in enumerate(dict.fromkeys(col))}
+                self._columns[name] = np.fromiter(map(codes.__getitem__, col), dtype=np.int32, count=len(col))
+                self.values[name] = list(codes)
+                self._codes[name] = codes
+
+    def column(self, name):
+        return self._columns[name]
+
+    def code_of(self, name):
+        return self._codes[name]
+
+    def month_rows(self, year, month):
+        start, count = self._months.get((str(year), str(month)), (0, 0))
+        return np.arange(start, start + count)
+
+
+class MonthBlock:
+    """
+    Typed arrays for one channel and one (year, month).
+
+    sku_names / categories: per SKU row (last row wins for a repeated SKU)
+    sku_profit:             float64 profit per item, aligned with sku_names
+    sku_price:              float64 sold price before VAT, aligned with sku_names
+    sku_category:           int32 index into `categories`
+    sales_skus:             SKU per sales row, in table order
+    units:                  int64 units sold per sales row
+    sales_sku_idx:          int64 index into sku_names, -1 if the SKU has no data
+    line_profit:            float64 profit per sales row (0.0 when unmatched)
+    """
+
+    def __init__(self, sku_rows, sales_rows):
+        sku_pos = {}
+        for i, row in enumerate(sku_rows):
+            sku_pos[row["sku"]] = i
+        keep = list(sku_pos.values())
+        self.sku_names = list(sku_pos.keys())
+        self.sku_profit = to_float_array([sku_rows[i]["profit"] for i in keep])
+        self.sku_price = to_float_array([sku_rows[i]["sold_price_before_vat"] for i in keep])
+
+        cat_codes = {}
+        self.sku_category = np.array(
+            [cat_codes.setdefault(sku_rows[i]["category"], len(cat_codes)) for i in keep],
+            dtype=np.int32
+        )
+        self.categories = list(cat_codes.keys())
+
+        sku_index = {name: i for i, name in enumerate(self.sku_names)}
+        self.sales_skus = [row["sku"] for row in sales_rows]
+        self.units = to_int_array([row["units_sold"] for row in sales_rows])
+        self.sales_sku_idx = np.array([sku_index.get(s, -1) for s in self.sales_skus], dtype=np.int64)
+        self._compute_line_profit()
+
+    @classmethod
+    def from_columns(cls, sku_cols, sales_cols, year, month):
+        """The same block, built from column_cache.ColumnTable arrays instead of row dicts."""
+        block = cls.__new__(cls)
+
+        rows = sku_cols.month_rows(year, month)
+        sku_codes = np.asarray(sku_cols.column("sku")[rows])
+        # one entry per SKU in order of first appearance, holding its last row (as in __init__)
+        uniq, first = np.unique(sku_codes, return_index=True)
+        _, last_from_end = np.unique(sku_codes[::-1], return_index=True)
+        by_first = np.argsort(first, kind="stable")
+        keep = rows[(len(sku_codes) - 1 - last_from_end)[by_first]]
+        sku_values = sku_cols.values["sku"]
+        block.sku_names = list(map(sku_values.__getitem__, uniq[by_first].tolist()))
+        block.sku_profit = np.asarray(sku_cols.column("profit")[keep], dtype=np.float64)
+        block.sku_price = np.asarray(sku_cols.column("sold_price_before_vat")[keep], dtype=np.float64)
+
+        cat_codes = np.asarray(sku_cols.column("category")[keep])
+        cats, cat_first, cat_inverse = np.unique(cat_codes, return_index=True, return_inverse=True)
+        cat_by_first = np.argsort(cat_first, kind="stable")
+        renumber = np.empty(len(cats), dtype=np.int32)
+        renumber[cat_by_first] = np.arange(len(cats), dtype=np.int32)
+        block.sku_category = renumber[cat_inverse.reshape(-1)]
+        cat_values = sku_cols.values["category"]
+        block.categories = list(map(cat_values.__getitem__, cats[cat_by_first].tolist()))
+
+        sales_rows = sales_cols.month_rows(year, month)
+        sales_codes = np.asarray(sales_cols.column("sku")[sales_rows])
+        sales_values = sales_cols.values["sku"]
+        block.sales_skus = list(map(sales_values.__getitem__, sales_codes.tolist()))
+        block.units = np.asarray(sales_cols.column("units_sold")[sales_rows], dtype=np.int64)
+        # join on SKU through the sales table's dictionary: code -> index into sku_names
+        to_sku_idx = np.full(len(sales_values), -1, dtype=np.int64)
+        codes = np.fromiter(
+            map(sales_cols.code_of("sku").get, block.sku_names, repeat(-1)),
+            dtype=np.int64, count=len(block.sku_names)
+        )
+        found = codes >= 0
+        to_sku_idx[codes[found]] = np.flatnonzero(found)
+        block.sales_sku_idx = to_sku_idx[sales_codes]
+        block._compute_line_profit()
+        return block
+
+    def _compute_line_profit(self):
+        matched = self.sales_sku_idx >= 0
+        self.line_profit = np.zeros(len(self.sales_skus), dtype=np.float64)
+        self.line_profit[matched] = self.sku_profit[self.sales_sku_idx[matched]] * self.units[matched]
+
+    @property
+    def matched(self):
+        return self.sales_sku_idx >= 0
+
+    def total_profit(self):
+        return float(self.line_profit.sum())
+
+    def category_totals(self):
+        """{category -> total line profit} via a bincount group-by."""
+        if not self.categories:
+            return {}
+        matched = self.matched
+        codes = self.sku_category[self.sales_sku_idx[matched]]
+        sums = np.bincount(codes, weights=self.line_profit[matched], minlength=len(self.categories))
+        return {cat: float(sums[i]) for i, cat in enumerate(self.categories)}
+
+
+class ChannelEngine:
+    def __init__(self, store, sku_csv, sales_csv, column_cache=None):
+        self.store = store
+        self.sku_csv = sku_csv
+        self.sales_csv = sales_csv
+        self.column_cache = column_cache
+        self._blocks = {}   # (year, month) -> MonthBlock
+        store.table(sku_csv).add_listener(self._invalidate)
+        store.table(sales_csv).add_listener(self._invalidate)
+
+    def _invalidate(self, filepath, months):
+        for key in months:
+            self._blocks.pop(key, None)
+
+    def block(self, year, month):
+        key = (str(year), str(month))
+        if key not in self._blocks:
+            self._blocks[key] = self._build_block(*key)
+        return self._blocks[key]
+
+    def _build_block(self, year, month):
+        if self.column_cache is not None:
+            sku_cols = self.column_cache.get(self.sku_csv)
+            sales_cols = self.column_cache.get(self.sales_csv)
+            if sku_cols is not None and sales_cols is not None:
+                return MonthBlock.from_columns(sku_cols, sales_cols, year, month)
+        return MonthBlock(
+            self.store.table(self.sku_csv).month_rows(year, month),
+            self.store.table(self.sales_csv).month_rows(year, month)
+        )
+
+    def months(self):
+        return set(self.store.table(self.sales_csv).months())
+
+    def prefetch(self, months):
+        """
+        Build the blocks of `months` that are not cached yet; when they are more than
+        BULK_BUILD_FRACTION of the channel's months, from whole-table columns.
+        """
+        missing = [key for key in ((str(y), str(m)) for y, m in months) if key not in self._blocks]
+        if not missing:
+            return
+        uses_cache = self.column_cache is not None and all(
+            self.column_cache.get(f) is not None for f in (self.sku_csv, self.sales_csv)
+        )
+        if uses_cache or len(missing) <= BULK_BUILD_FRACTION * len(self.months()):
+            for key in missing:
+                self.block(*key)
+            return
+        sku_cols = TableColumns(self.store.table(self.sku_csv), SKU_COLUMN_TYPES)
+        sales_cols = TableColumns(self.store.table(self.sales_csv), SALES_COLUMN_TYPES)
+        for key in missing:
+            self._blocks[key] = MonthBlock.from_columns(sku_cols, sales_cols, *key)
+
+    def monthly_totals(self):
+        """{(year, month) -> total line profit} for every month with sales."""
+        months = self.months()
+        self.prefetch(months)
+        return {key: self.block(*key).total_profit() for key in months}
+
+
+class ProfitEngine:
+    """One ChannelEngine per sales channel ("ebay", "woo")."""
+
+    def __init__(self, store, column_cache=None):
+        self.channels = {
+            name: ChannelEngine(store, sku_csv, sales_csv, column_cache)
+            for name, (sku_csv, sales_csv) in SALES_CHANNELS.items()
+        }
+
+    def channel(self, name):
+        return self.channels[name]
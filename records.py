@@ -0,0 +1,99 @@
+"""
+Compact row records for the data store tables.
+
+A csv.DictReader row is a dict per row, each holding its own copies of
+strings like "Small Dendrobaena" or "WD-FOOD1000" that repeat in every month
+a SKU is carried over to. make_record_type() builds a __slots__ class for a
+table's columns instead: there is no per-row dict, and the repetitive text
+columns (SKU, category, business/cost name, year, month) are interned so all
+rows share one string object per distinct value.
+
+Records stand in for the row dicts wherever rows are used: row[f],
+row[f] = v, get(), update(), keys()/items(), `in`, dict(row), and
+csv.DictWriter writes them as they are. Only the table's own columns can be
+set.
+"""
+import sys
+
+
+class Record:
+    __slots__ = ()
+    _KEYS = {}.keys()          # the table's columns, in order (a keys view, so DictWriter can diff it)
+    _INTERNED = frozenset()    # columns whose values are interned
+
+    def __init__(self, row=None):
+        get = row.get if row is not None else {}.get
+        for field in self._KEYS:
+            value = get(field, "")
+            if field in self._INTERNED and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    # --------------------------------------------------
+    # Mapping interface
+    # --------------------------------------------------
+    def __getitem__(self, key):
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        if key in self._INTERNED and type(value) is str:
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        if key in self._KEYS:
+            return getattr(self, key)
+        return default
+
+    def update(self, other=(), **kwargs):
+        if hasattr(other, "keys"):
+            for key in other.keys():
+                self[key] = other[key]
+        else:
+            for key, value in other:
+                self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def keys(self):
+        return self._KEYS
+
+    def values(self):
+        return [getattr(self, f) for f in self._KEYS]
+
+    def items(self):
+        return [(f, getattr(self, f)) for f in self._KEYS]
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.values() == other.values()
+        if isinstance(other, (Record, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+def make_record_type(name, fieldnames, interned=()):
+    """A Record subclass with one slot per column of `fieldnames`; `interned` columns share their strings."""
+    return type(name, (Record,), {
+        "__slots__": tuple(fieldnames),
+        "_KEYS": dict.fromkeys(fieldnames).keys(),
+        "_INTERNED": frozenset(interned),
+    })
@@ -0,0 +1,252 @@
+"""
+Monthly profit/expense totals computed in a pool of worker processes.
+
+The monthly cache normally computes a missing month through the profit engine
+on the I/O worker thread: eBay, then Woo, then B2B, one month after another,
+on one core. When many months are missing at once (first run, or files edited
+outside the app) ReportEngine splits the work into one task per (channel,
+year). Each task reads that year of the channel's tables from storage, builds
+the month blocks and returns per-month partial totals; the partials are merged
+into {(year, month) -> {channel -> {"profit", "expense", "lines"}}}, the
+monthly cache's own layout.
+
+A task reads only its own year. Backends that can read one month (partitioned,
+clustered, sqlite) are asked for the task's months. Plain CSV files are first
+indexed with one pass per file over the raw lines (year_runs: the byte ranges
+each year's rows occupy, found without parsing the rows), so every row is
+parsed by exactly one task instead of every task scanning the whole file.
+
+Workers read what was last saved (every tab saves as it edits), through the
+same storage backend as the app, configured once in each worker process.
+processes=0 runs the same tasks serially in the calling process.
+"""
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from data_utils import file_signature, get_storage_backend, iter_csv_rows, period_key, storage_signature
+from month_snapshots import b2b_totals
+from profit_engine import MonthBlock, SALES_CHANNELS
+from storage import B2B_CSV, STORAGE_BACKEND, configure_storage
+
+# Worker processes for the report engine: None = one per core, 0 = serial (no pool)
+REPORT_PROCESSES = None
+
+CHANNELS = list(SALES_CHANNELS) + ["b2b"]
+
+# channel -> the tables its totals are read from
+CHANNEL_FILES = {channel: list(files) for channel, files in SALES_CHANNELS.items()}
+CHANNEL_FILES["b2b"] = [B2B_CSV]
+
+# Only the columns the totals need are read
+SKU_COLUMNS   = ["month", "year", "sku", "category", "sold_price_before_vat", "profit"]
+SALES_COLUMNS = ["month", "year", "sku", "units_sold"]
+B2B_COLUMNS   = ["month", "year", "expense", "profit"]
+
+
+# --------------------------------------------------
+# Worker side
+# --------------------------------------------------
+def _init_worker(storage_kind):
+    configure_storage(storage_kind)
+
+
+def year_runs(filepath):
+    """
+    Where each year's rows are in a plain CSV file: {"signature", "header", "runs":
+    {year -> [[start, end], ...]}}, byte ranges in file order with neighbouring rows
+    merged. Only the year field of each raw line is looked at.
+    """
+    index = {"signature": file_signature(filepath), "header": [], "runs": {}}
+    if index["signature"] is None:
+        return index
+    runs = index["runs"]
+    with open(filepath, "rb") as f:
+        header = index["header"] = next(csv.reader([f.readline().decode("utf-8")]), [])
+        if "year" not in header:
+            return index
+        year_pos = header.index("year")
+        pos = f.tell()
+        lines = iter(f)
+        last, last_year = None, None   # the run the previous row went into, and its year
+        for line in lines:
+            start = pos
+            # a quoted field may span lines: keep reading until the quotes balance
+            while line.count(b'"') % 2:
+                more = next(lines, b"")
+                if not more:
+                    break
+                line += more
+            pos = start + len(line)
+            if b'"' in line:
+                values = next(csv.reader([line.decode("utf-8")]), [])
+            else:
+                values = [v.decode("utf-8") for v in line.rstrip(b"\r\n").split(b",", year_pos + 1)]
+            if not line.strip() or year_pos >= len(values):
+                if last is not None:
+                    last[1] = pos   # blank or short line: skipped by the reader anyway
+                continue
+            year = values[year_pos]
+            if last is not None and last_year == year:
+                last[1] = pos
+            else:
+                last, last_year = [start, pos], year
+                runs.setdefault(year, []).append(last)
+    return index
+
+
+def _read_runs(filepath, index, columns, year):
+    """The rows of `year` at the byte ranges year_runs() found, as dicts of `columns`."""
+    if file_signature(filepath) != index["signature"]:
+        # saved since it was indexed: scan the file as it is now
+        yield from (dict(zip(columns, values)) for values in iter_csv_rows(filepath, columns, year=year))
+        return
+    pos = {}
+    for i, name in enumerate(index["header"]):
+        pos.setdefault(name, i)
+    wanted = [pos.get(c) for c in columns]
+    with open(filepath, "rb") as f:
+        for start, end in index["runs"].get(year, []):
+            f.seek(start)
+            text = f.read(end - start).decode("utf-8")
+            for row in csv.reader(io.StringIO(text, newline="")):
+                if not row:
+                    continue
+                n = len(row)
+                yield dict(zip(columns, (row[i] if i is not None and i < n else None for i in wanted)))
+
+
+# Tables read whole by a backend without month reads, kept for the next task:
+#   filepath -> (storage signature, {year -> [row, ...]})   (per process)
+_read_tables = {}
+
+
+def _month_rows(filepath, columns, year, months, index=None):
+    """{month -> [row, ...]} of `months` of one year of a table, from the configured storage."""
+    backend = get_storage_backend()
+    if backend is None:
+        rows = _read_runs(filepath, index, columns, year) if index is not None else (
+            dict(zip(columns, values)) for values in iter_csv_rows(filepath, columns, year=year)
+        )
+    elif hasattr(backend, "read_month"):
+        return {month: backend.read_month(filepath, year, month) for month in months}
+    else:
+        signature = storage_signature(filepath)
+        cached = _read_tables.get(filepath)
+        if cached is None or cached[0] != signature:
+            by_year = {}
+            for row in backend.read_dicts(filepath):
+                by_year.setdefault(str(row["year"]), []).append(row)
+            cached = _read_tables[filepath] = (signature, by_year)
+        rows = cached[1].get(year, [])
+
+    wanted = set(months)
+    by_month = {}
+    for row in rows:
+        if str(row["month"]) in wanted:
+            by_month.setdefault(str(row["month"]), []).append(row)
+    return by_month
+
+
+def channel_year_totals(channel, year, months, indexes=None):
+    """
+    {month -> {"profit", "expense", "lines"}} of one channel for `months` of one year.
+    indexes: {filepath -> year_runs(filepath)} of the channel's CSV files, if indexed.
+    """
+    indexes = indexes or {}
+    if channel == "b2b":
+        b2b_rows = _month_rows(B2B_CSV, B2B_COLUMNS, year, months, indexes.get(B2B_CSV))
+        return {month: b2b_totals(b2b_rows.get(month, [])) for month in months}
+
+    sku_csv, sales_csv = SALES_CHANNELS[channel]
+    sku_rows = _month_rows(sku_csv, SKU_COLUMNS, year, months, indexes.get(sku_csv))
+    sales_rows = _month_rows(sales_csv, SALES_COLUMNS, year, months, indexes.get(sales_csv))
+    totals = {}
+    for month in months:
+        block = MonthBlock(sku_rows.get(month, []), sales_rows.get(month, []))
+        totals[month] = {
+            "profit": block.total_profit(),
+            "expense": 0.0,
+            "lines": int(block.matched.sum()),
+        }
+    return totals
+
+
+# --------------------------------------------------
+# Engine
+# --------------------------------------------------
+class ReportEngine:
+    def __init__(self, storage_kind=STORAGE_BACKEND, processes=REPORT_PROCESSES):
+        """
+        storage_kind: the app's storage backend (see storage.configure_storage)
+        processes: worker processes (None = one per core, 0 = serial)
+        """
+        self.storage_kind = storage_kind
+        self.processes = os.cpu_count() if processes is None else processes
+        self._pool = None
+
+    @property
+    def parallel(self):
+        return self.processes > 0
+
+    def _executor(self):
+        # Started on first use and kept; "spawn" so no worker is forked from the Tk/I-O threads
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.storage_kind,)
+            )
+        return self._pool
+
+    def _map(self, fn, *iterables):
+        """fn over the arguments in `iterables`: in the pool, or in this process when serial."""
+        if self.parallel:
+            return self._executor().map(fn, *iterables)
+        return map(fn, *iterables)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def compute_months(self, months):
+        """
+        Per-channel totals for every (year, month) in `months`, as
+        {(year, month) -> {channel -> {"profit", "expense", "lines"}}}.
+        """
+        by_year = {}
+        for year, month in months:
+            by_year.setdefault(str(year), []).append(str(month))
+        if not by_year:
+            return {}
+
+        # plain CSV files: one pass per file finds each year's rows for the tasks below
+        indexes = {}
+        if self.storage_kind == "csv":
+            files = [f for channel in CHANNELS for f in CHANNEL_FILES[channel]]
+            indexes = dict(zip(files, self._map(year_runs, files)))
+
+        def year_indexes(channel, year):
+            return {
+                f: dict(indexes[f], runs={year: indexes[f]["runs"].get(year, [])})
+                for f in CHANNEL_FILES[channel] if f in indexes
+            }
+
+        tasks = [
+            (channel, year, sorted(year_months, key=int), year_indexes(channel, year))
+            for year, year_months in sorted(by_year.items(), key=lambda item: int(item[0]))
+            for channel in CHANNELS
+        ]
+        partials = self._map(channel_year_totals, *zip(*tasks))
+
+        merged = {}
+        for (channel, year, _, _), partial in zip(tasks, partials):
+            for month, totals in partial.items():
+                merged.setdefault((year, month), {})[channel] = totals
+        if not self.parallel:
+            _read_tables.clear()   # whole tables kept for the tasks: not for the app's lifetime
+        return dict(sorted(merged.items(), key=lambda item: period_key(*item[0])))
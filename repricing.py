@@ -0,0 +1,125 @@
+"""
+Keeps eBay/Woo SKU expenses and profit in step with the Costs tab.
+
+A SKU's packaging field references cost_names ("White tub - 1.8 litres, 0.30"),
+so its total_expenses / profit_margin / profit depend on those costs for the
+same month. This engine keeps a per-month dependency index
+
+    cost_name -> {(sku csv, sku), ...}
+
+and, whenever the costs table writes a month, works out which cost values
+actually changed (including added/removed names), recomputes only the SKUs
+that reference them and saves each SKU table once. Archived months are left
+alone.
+"""
+from data_utils import packaging_cost_names
+from month_status import is_month_archived
+
+EBAY_SKU_CSV = "ebay_sku.csv"
+WOO_SKU_CSV  = "woo_sku.csv"
+COSTS_CSV    = "costs_data.csv"
+
+SKU_TABLES = [EBAY_SKU_CSV, WOO_SKU_CSV]
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def repriced_fields(row, packaging_sum):
+    """The derived SKU fields for `row` with a new packaging total (same maths as add_ebay_sku)."""
+    before_vat = _to_float(row["sold_price_before_vat"])
+    total_expenses = (
+        _to_float(row["cost_of_item"]) + _to_float(row["transaction_fee"])
+        + packaging_sum + _to_float(row["delivery"])
+    )
+    profit = before_vat - total_expenses
+    profit_margin = (profit / before_vat)*100 if before_vat != 0 else 0.0
+    return {
+        "total_expenses": f"{total_expenses:.2f}",
+        "profit_margin": f"{profit_margin:.2f}",
+        "profit": f"{profit:.2f}",
+    }
+
+
+class RepricingEngine:
+    def __init__(self, store, cost_cache):
+        self.store = store
+        self.cost_cache = cost_cache
+        self._deps = {}          # (year, month) -> { cost_name -> {(sku csv, sku), ...} }
+        self._known_costs = {}   # (year, month) -> cost dict the SKUs were last priced with
+        self.last_repriced = {}  # sku csv -> rows updated by the latest cost write
+        for key in store.table(COSTS_CSV).months():
+            self._known_costs[key] = dict(cost_cache.cost_data(*key))
+        for filepath in SKU_TABLES:
+            store.table(filepath).add_listener(self._invalidate_deps)
+        store.table(COSTS_CSV).add_listener(self.on_costs_written)
+
+    # --------------------------------------------------
+    # Dependency index
+    # --------------------------------------------------
+    def _invalidate_deps(self, filepath, months):
+        for key in months:
+            self._deps.pop(key, None)
+
+    def dependents(self, year, month):
+        """{ cost_name -> {(sku csv, sku), ...} } for one month, built on first use."""
+        key = (str(year), str(month))
+        if key not in self._deps:
+            deps = {}
+            for filepath in SKU_TABLES:
+                for row in self.store.table(filepath).month_rows(*key):
+                    for name in packaging_cost_names(row["packaging"]):
+                        deps.setdefault(name, set()).add((filepath, row["sku"]))
+            self._deps[key] = deps
+        return self._deps[key]
+
+    # --------------------------------------------------
+    # Repricing
+    # --------------------------------------------------
+    def on_costs_written(self, filepath, months):
+        """Costs table listener: reprice the SKUs that reference a cost whose value changed."""
+        # make sure the cost cache is not still holding the old values
+        self.cost_cache.invalidate(filepath, months)
+        changed_by_month = {}
+        for key in months:
+            if is_month_archived(*key):
+                continue
+            old = self._known_costs.get(key, {})
+            new = self.cost_cache.cost_data(*key)
+            changed_by_month[key] = {name for name in set(old) | set(new) if old.get(name) != new.get(name)}
+            self._known_costs[key] = dict(new)
+        self.last_repriced = self.reprice(changed_by_month)
+
+    def reprice(self, changed_by_month):
+        """
+        changed_by_month: { (year, month) -> {cost_name, ...} }
+        Recompute every SKU whose packaging references one of the changed costs in its
+        month, then save each SKU table that changed once. Returns { sku csv -> rows updated }.
+        """
+        counts = {filepath: 0 for filepath in SKU_TABLES}
+        for (year, month), cost_names in changed_by_month.items():
+            deps = self.dependents(year, month)
+            affected = set()
+            for name in cost_names:
+                affected.update(deps.get(name, ()))
+
+            for filepath, sku in affected:
+                table = self.store.table(filepath)
+                row = table.get(year, month, sku)
+                if row is None:
+                    continue
+                packaging_sum = self.cost_cache.packaging_cost(row["packaging"], year, month)
+                fields = repriced_fields(row, packaging_sum)
+                if any(row.get(k) != v for k, v in fields.items()):
+                    fields.update({"year": year, "month": month, "sku": sku})
+                    table.upsert(fields)
+                    counts[filepath] += 1
+
+        for filepath, updated in counts.items():
+            if updated:
+                self.store.table(filepath).save()
+        return counts
@@ -0,0 +1,62 @@
+"""
+Month roll-over for every table at once.
+
+roll_over() carries each table's rows from the month before a target month
+into the target (any key already there is left alone), for one month or a
+whole range of months in one go. Rows are found through the DataStore's
+(year, month) and (year, month, key) indexes, and each table is saved once
+however many months are rolled, so a plain CSV file is rewritten atomically
+one time per table.
+"""
+from month_status import get_previous_month_year, is_month_archived
+
+EBAY_SKU_CSV = "ebay_sku.csv"
+WOO_SKU_CSV  = "woo_sku.csv"
+B2B_CSV      = "b2b_data.csv"
+COSTS_CSV    = "costs_data.csv"
+
+# Costs first: saved before the SKUs exist in the new month, so repricing leaves
+# the carried SKU rows exactly as they were (see repricing)
+ROLLOVER_TABLES = [COSTS_CSV, EBAY_SKU_CSV, WOO_SKU_CSV, B2B_CSV]
+
+
+def months_in_range(from_year, from_month, to_year, to_month):
+    """[(year, month), ...] as strings from (from_year, from_month) to (to_year, to_month) inclusive."""
+    y, m = int(from_year), int(from_month)
+    end = (int(to_year), int(to_month))
+    months = []
+    while (y, m) <= end:
+        months.append((str(y), str(m)))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+def roll_over(store, targets, tables=ROLLOVER_TABLES):
+    """
+    targets: [(year, month), ...], oldest first; each one receives the rows of the
+    month before it, so rolling a range chains N -> N+1 -> N+2. Archived targets
+    are skipped. Returns {"counts": {csv -> rows carried}, "skipped": [(year, month), ...]}.
+    """
+    targets = [(str(y), str(m)) for y, m in targets]
+    skipped = [key for key in targets if is_month_archived(*key)]
+    targets = [key for key in targets if key not in skipped]
+
+    counts = {}
+    for filepath in tables:
+        table = store.table(filepath)
+        carried = 0
+        for year, month in targets:
+            prev_year, prev_month = get_previous_month_year(year, month)
+            new_rows = []
+            for row in table.month_rows(prev_year, prev_month):
+                if table.get(year, month, row[table.key_field]) is None:
+                    new_row = dict(row)
+                    new_row["year"] = year
+                    new_row["month"] = month
+                    new_rows.append(new_row)
+            # upserted now so the next target in the range sees them
+            carried += table.bulk_upsert(new_rows)["inserted"]
+        if carried:
+            table.save()
+        counts[filepath] = carried
+    return {"counts": counts, "skipped": skipped}
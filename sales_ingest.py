@@ -0,0 +1,202 @@
+"""
+Order-level sales ingestion.
+
+The sales tables hold one units_sold figure per (year, month, SKU). This
+module turns raw order lines (date, sku, qty) into those figures:
+
+  1. iter_order_lines() streams an order export and derives (year, month)
+     from each line's date.
+  2. OrderAggregator sums the lines per (year, month, sku) as they stream
+     past. It keeps at most `max_groups` partial sums in memory; past that
+     they are spilled to one temporary file per month and merged back one
+     month at a time, so memory stays flat however many orders come in.
+  3. merge_into_table() writes each month's totals into the sales Table with
+     one indexed bulk upsert per month, either replacing units_sold
+     ("replace") or adding to it ("add"), and saves the table once.
+"""
+import csv
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+
+from data_utils import period_key
+from month_status import is_month_archived
+
+DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d",
+    "%d/%m/%Y %H:%M", "%d/%m/%Y",
+    "%b-%d-%y", "%d-%b-%y", "%d %b %Y",
+)
+# eBay reports start with a few lines before the column headers
+HEADER_SEARCH_LINES = 10
+MAX_GROUPS = 200_000
+
+MODES = ("replace", "add")
+
+
+@lru_cache(maxsize=65536)
+def order_month(value, date_formats=DATE_FORMATS):
+    """(year, month) strings for an export's date value, or None if no format matches."""
+    value = value.strip()
+    for fmt in date_formats:
+        try:
+            d = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return (str(d.year), str(d.month))
+    return None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+def iter_order_lines(filepath, sku_column, qty_column, date_column, date_formats=DATE_FORMATS, stats=None):
+    """
+    Yields (year, month, sku, qty) for every usable line of an order export.
+    `stats`, if given, is updated with "lines" read and "skipped" lines (no SKU,
+    an unreadable date or a non-whole quantity).
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("lines", 0)
+    stats.setdefault("skipped", 0)
+    with open(filepath, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        wanted = {sku_column, qty_column, date_column}
+        for _ in range(HEADER_SEARCH_LINES):
+            header = next(reader, None)
+            if header is None or wanted <= set(header):
+                break
+        if header is None or not wanted <= set(header):
+            raise ValueError(f"{filepath}: no header row with the columns {sorted(wanted)}")
+        sku_i, qty_i, date_i = header.index(sku_column), header.index(qty_column), header.index(date_column)
+        width = max(sku_i, qty_i, date_i) + 1
+
+        for row in reader:
+            if not row:
+                continue
+            stats["lines"] += 1
+            if len(row) < width:
+                stats["skipped"] += 1   # e.g. the "n record(s) downloaded" footer
+                continue
+            sku = row[sku_i].strip()
+            month = order_month(row[date_i], date_formats)
+            try:
+                qty = int(row[qty_i])
+            except ValueError:
+                qty = None
+            if not sku or month is None or qty is None:
+                stats["skipped"] += 1
+                continue
+            yield month[0], month[1], sku, qty
+
+
+# --------------------------------------------------
+# Streaming group-by
+# --------------------------------------------------
+class OrderAggregator:
+    """Units per (year, month, sku) over a stream of order lines, in bounded memory."""
+
+    def __init__(self, max_groups=MAX_GROUPS):
+        self.max_groups = max_groups
+        self._partial = {}     # (year, month) -> {sku -> units}
+        self._groups = 0       # partial sums currently held
+        self._spilled = set()  # (year, month) with a spill file
+        self._spill_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def add(self, year, month, sku, qty):
+        month_sums = self._partial.setdefault((year, month), {})
+        if sku in month_sums:
+            month_sums[sku] += qty
+            return
+        month_sums[sku] = qty
+        self._groups += 1
+        if self._groups >= self.max_groups:
+            self._spill()
+
+    def add_all(self, order_lines):
+        for year, month, sku, qty in order_lines:
+            self.add(year, month, sku, qty)
+        return self
+
+    def _spill_path(self, year, month):
+        return os.path.join(self._spill_dir, f"{year}-{month}.csv")
+
+    def _spill(self):
+        """Append every partial sum to its month's spill file and start over."""
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="sales_ingest_")
+        for (year, month), month_sums in self._partial.items():
+            with open(self._spill_path(year, month), "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(month_sums.items())
+            self._spilled.add((year, month))
+        self._partial = {}
+        self._groups = 0
+
+    def months(self):
+        """Every (year, month) seen, oldest first."""
+        return sorted(self._spilled | set(self._partial), key=lambda key: period_key(*key))
+
+    def month_totals(self, year, month):
+        """{sku -> units} for one month: its spill file, streamed, plus what is still in memory."""
+        totals = {}
+        if (year, month) in self._spilled:
+            with open(self._spill_path(year, month), "r", newline="", encoding="utf-8") as f:
+                for sku, units in csv.reader(f):
+                    totals[sku] = totals.get(sku, 0) + int(units)
+        for sku, units in self._partial.get((year, month), {}).items():
+            totals[sku] = totals.get(sku, 0) + units
+        return totals
+
+
+# --------------------------------------------------
+# Merge
+# --------------------------------------------------
+def merge_into_table(table, aggregator, mode="replace"):
+    """
+    Write the aggregated units into a sales Table (see data_store), one bulk upsert
+    per month touched, and save it once. mode "replace" sets units_sold to the
+    imported total; "add" adds it to what the month already has. Archived months
+    are left alone. Returns {"sku_months", "inserted", "updated", "archived_months"}.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+    stats = {"sku_months": 0, "inserted": 0, "updated": 0, "archived_months": []}
+    for year, month in aggregator.months():
+        if is_month_archived(year, month):
+            stats["archived_months"].append((year, month))
+            continue
+        batch = []
+        for sku, units in aggregator.month_totals(year, month).items():
+            if mode == "add":
+                existing = table.get(year, month, sku)
+                if existing is not None:
+                    units += _to_int(existing["units_sold"])
+            batch.append({"month": month, "year": year, "sku": sku, "units_sold": str(units)})
+        result = table.bulk_upsert(batch)
+        stats["sku_months"] += len(batch)
+        stats["inserted"] += result["inserted"]
+        stats["updated"] += result["updated"]
+    if stats["sku_months"]:
+        table.save()
+    return stats
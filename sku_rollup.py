@@ -0,0 +1,209 @@
+"""
+Per-SKU rollups across the eBay and WooCommerce channels.
+
+The sales reports show one channel for one month. SkuRollup keeps, for every
+channel and month, the month's sales summed per SKU over one shared SKU
+numbering (codes ascending):
+
+    codes    int32 SKU code (index into sku_names) of every SKU sold that month
+    lines    sales lines of the SKU
+    units    units sold
+    profit   line profit (0.0 for lines whose SKU has no data that month)
+    revenue  units x sold price before VAT, for margins
+
+and, per channel, running totals of the same four sums over all of its months
+(one array entry per SKU code). A write to a channel's SKU or sales table takes
+the months it wrote out of the running totals; they are rebuilt from the
+profit engine's month blocks and added back the next time a query needs them.
+
+"Top N SKUs by profit over a date range" is answered from the running totals
+when the range covers most of a channel's months (minus the months outside
+it), and otherwise from one bincount over the months in range. A SKU's
+history is one binary search per month.
+
+Margins are profit / revenue x 100, like the profit_margin of the SKU tables.
+"""
+import numpy as np
+
+from data_utils import period_key
+
+CHANNEL_NAMES = {"ebay": "eBay", "woo": "Woo"}
+
+
+def margin(profit, revenue):
+    return (profit / revenue) * 100 if revenue else 0.0
+
+
+class SkuRollup:
+    def __init__(self, store, profit_engine):
+        self.store = store
+        self.profit_engine = profit_engine
+        self.sku_names = []
+        self._sku_codes = {}   # sku -> index into sku_names
+        self._months = {}      # (channel, year, month) -> (codes, lines, units, profit, revenue)
+        self._totals = {}      # channel -> [lines, units, profit, revenue] over its months in _months
+        self._channel_of = {}  # table filepath -> channel
+        for channel, engine in profit_engine.channels.items():
+            self._totals[channel] = [np.zeros(0) for _ in range(4)]
+            for filepath in (engine.sku_csv, engine.sales_csv):
+                self._channel_of[filepath] = channel
+                store.table(filepath).add_listener(self._invalidate)
+
+    def _invalidate(self, filepath, months):
+        channel = self._channel_of[filepath]
+        for year, month in months:
+            part = self._months.pop((channel, year, month), None)
+            if part is not None:
+                self._fold(channel, part, -1)
+
+    # --------------------------------------------------
+    # Month sums / running totals
+    # --------------------------------------------------
+    def _code(self, sku):
+        code = self._sku_codes.get(sku)
+        if code is None:
+            code = self._sku_codes[sku] = len(self.sku_names)
+            self.sku_names.append(sku)
+        return code
+
+    def _channel_totals(self, channel):
+        """The channel's running totals, grown to the current number of SKU codes."""
+        totals = self._totals[channel]
+        size = len(self.sku_names)
+        if len(totals[0]) < size:
+            totals[:] = [np.concatenate([t, np.zeros(size - len(t))]) for t in totals]
+        return totals
+
+    def _fold(self, channel, part, sign):
+        """Add (sign=1) or take out (sign=-1) one month's sums from the channel's running totals."""
+        codes = part[0]
+        for total, values in zip(self._channel_totals(channel), part[1:]):
+            total[codes] += sign * values   # codes are unique within a month
+
+    def _build_month(self, channel, year, month):
+        block = self.profit_engine.channel(channel).block(year, month)
+        skus = block.sales_skus
+        for sku in [s for s in dict.fromkeys(skus) if s not in self._sku_codes]:
+            self._code(sku)
+        line_codes = np.fromiter(map(self._sku_codes.__getitem__, skus), dtype=np.int32, count=len(skus))
+        matched = block.matched
+        revenue = np.zeros(len(line_codes), dtype=np.float64)
+        revenue[matched] = block.sku_price[block.sales_sku_idx[matched]] * block.units[matched]
+        codes, inverse = np.unique(line_codes, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        return (codes,) + tuple(
+            np.bincount(inverse, weights=weights, minlength=len(codes))
+            for weights in (None, block.units, block.line_profit, revenue)
+        )
+
+    def _ensure(self, channel, months):
+        """Compute (and fold into the running totals) any of the channel's `months` not held yet."""
+        missing = [ym for ym in months if (channel,) + ym not in self._months]
+        self.profit_engine.channel(channel).prefetch(missing)
+        for year, month in missing:
+            part = self._months[(channel, year, month)] = self._build_month(channel, year, month)
+            self._fold(channel, part, 1)
+
+    def _sum_months(self, channel, months):
+        """[lines, units, profit, revenue] per SKU code over `months` of one channel."""
+        size = len(self.sku_names)
+        parts = [self._months[(channel,) + ym] for ym in months]
+        if not parts:
+            return [np.zeros(size) for _ in range(4)]
+        codes = np.concatenate([part[0] for part in parts])
+        return [
+            np.bincount(codes, weights=np.concatenate([part[i] for part in parts]), minlength=size)
+            for i in range(1, 5)
+        ]
+
+    def _range_sums(self, channel, start, end):
+        """[lines, units, profit, revenue] per SKU code of one channel from `start` to `end`."""
+        months = self._channel_months(channel)
+        inside = [ym for ym in months if period_key(*start) <= period_key(*ym) <= period_key(*end)]
+        if len(inside) * 2 <= len(months):
+            self._ensure(channel, inside)
+            return self._sum_months(channel, inside)
+        # most of the history: the running totals less the months outside the range
+        self._ensure(channel, months)
+        inside = set(inside)
+        outside = self._sum_months(channel, [ym for ym in months if ym not in inside])
+        return [total - out for total, out in zip(self._channel_totals(channel), outside)]
+
+    def _channel_months(self, channel):
+        """The channel's (year, month) pairs with sales, oldest first."""
+        sales_csv = self.profit_engine.channel(channel).sales_csv
+        return sorted(self.store.table(sales_csv).months(), key=lambda key: period_key(*key))
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+    def top_skus(self, n, start, end, channels=None):
+        """
+        The `n` SKUs with the most profit from `start` to `end` ((year, month), inclusive),
+        best first, as dicts: {"sku", "units", "profit", "margin",
+        "channels": {channel -> {"units", "profit", "margin"}}} (channels the SKU sold on).
+        """
+        channels = list(channels or self.profit_engine.channels)
+        start, end = (str(start[0]), str(start[1])), (str(end[0]), str(end[1]))
+        sums = {channel: self._range_sums(channel, start, end) for channel in channels}
+        size = len(self.sku_names)
+        # every channel's sums over the same (final) number of SKU codes
+        sums = {
+            channel: [np.concatenate([s, np.zeros(size - len(s))]) for s in channel_sums]
+            for channel, channel_sums in sums.items()
+        }
+        if not size:
+            return []
+
+        lines = sum(s[0] for s in sums.values())
+        total_profit = sum(s[2] for s in sums.values())
+        sold = np.flatnonzero(lines)
+        if len(sold) > n > 0:
+            sold = sold[np.argpartition(-total_profit[sold], n - 1)[:n]]
+        sold = sold[np.argsort(-total_profit[sold], kind="stable")][:max(n, 0)]
+
+        result = []
+        for code in sold.tolist():
+            per_channel = {}
+            for channel, (ch_lines, ch_units, ch_profit, ch_revenue) in sums.items():
+                if ch_lines[code]:
+                    per_channel[channel] = {
+                        "units": int(ch_units[code]),
+                        "profit": float(ch_profit[code]),
+                        "margin": margin(float(ch_profit[code]), float(ch_revenue[code])),
+                    }
+            profit = sum(c["profit"] for c in per_channel.values())
+            revenue = sum(float(sums[ch][3][code]) for ch in per_channel)
+            result.append({
+                "sku": self.sku_names[code],
+                "units": sum(c["units"] for c in per_channel.values()),
+                "profit": profit,
+                "margin": margin(profit, revenue),
+                "channels": per_channel,
+            })
+        return result
+
+    def sku_history(self, sku, channels=None):
+        """
+        {(year, month) -> {channel -> {"units", "profit", "margin"}}} for every month the
+        SKU sold on any of `channels` (default: all), oldest first.
+        """
+        channels = list(channels or self.profit_engine.channels)
+        history = {}
+        for channel in channels:
+            months = self._channel_months(channel)
+            self._ensure(channel, months)
+            code = self._sku_codes.get(sku)
+            if code is None:
+                continue
+            for year, month in months:
+                codes, lines, units, profit, revenue = self._months[(channel, year, month)]
+                i = int(np.searchsorted(codes, code))
+                if i == len(codes) or codes[i] != code:
+                    continue
+                history.setdefault((year, month), {})[channel] = {
+                    "units": int(units[i]),
+                    "profit": float(profit[i]),
+                    "margin": margin(float(profit[i]), float(revenue[i])),
+                }
+        return dict(sorted(history.items(), key=lambda item: period_key(*item[0])))
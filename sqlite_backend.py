@@ -0,0 +1,164 @@
+"""
+Optional SQLite storage for the profit tracker tables.
+
+Each CSV file maps to one SQLite table named after the file ("ebay_sku.csv" ->
+"ebay_sku"), with every column stored as TEXT so rows round-trip exactly like
+the CSV strings. A composite primary key such as (year, month, sku) makes each
+upsert a single indexed row write instead of a full-file rewrite.
+
+Enable it with data_utils.set_storage_backend(SqliteBackend(...)); the CSV
+files stay the interchange format via import_csv_files / export_csv_files
+(the latter is "python cli.py --storage sqlite export-csv").
+"""
+import os
+import sqlite3
+
+from data_utils import iter_csv_rows, write_csv_file
+
+
+def _table_name(filepath):
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# Bumped in the same transaction as every write to a table (see signature)
+VERSIONS_TABLE = "_table_versions"
+
+
+class SqliteBackend:
+    def __init__(self, db_path, primary_keys):
+        """
+        db_path: SQLite database file
+        primary_keys: { csv_filepath -> ("year", "month", "sku"), ... }
+        """
+        self.db_path = db_path
+        self.primary_keys = primary_keys
+        # Opened on the Tk thread, then used from the I/O worker (one thread at a time)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def _bump_version(self, filepath):
+        self.conn.execute(
+            f"INSERT INTO {VERSIONS_TABLE} (name, version) VALUES (?, 1) "
+            f"ON CONFLICT (name) DO UPDATE SET version = version + 1",
+            (_table_name(filepath),)
+        )
+
+    def signature(self, filepath):
+        """The table's write count, kept in the database itself."""
+        row = self.conn.execute(
+            f"SELECT version FROM {VERSIONS_TABLE} WHERE name = ?", (_table_name(filepath),)
+        ).fetchone()
+        return [self.db_path, row[0] if row else 0]
+
+    def _columns(self, filepath):
+        cur = self.conn.execute(f"PRAGMA table_info({_quote(_table_name(filepath))})")
+        return [r[1] for r in cur.fetchall()]
+
+    def ensure_table(self, filepath, headers):
+        table = _quote(_table_name(filepath))
+        pk = self.primary_keys[filepath]
+        cols = ", ".join(f"{_quote(h)} TEXT NOT NULL DEFAULT ''" for h in headers)
+        pk_cols = ", ".join(_quote(k) for k in pk)
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols}, PRIMARY KEY ({pk_cols}))")
+            # The primary key already covers (year, month) and (year, month, key) lookups;
+            # the tabs also look SKUs / names up across all months.
+            if len(pk) > 2:
+                index = _quote(_table_name(filepath) + "_" + pk[-1])
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({_quote(pk[-1])})")
+
+    def read_dicts(self, filepath):
+        if not self._columns(filepath):
+            return []
+        cur = self.conn.execute(f"SELECT * FROM {_quote(_table_name(filepath))} ORDER BY rowid")
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, r)) for r in cur]
+
+    def read_month(self, filepath, year, month):
+        """The rows of one (year, month), through the primary key's (year, month) prefix."""
+        if not self._columns(filepath):
+            return []
+        cur = self.conn.execute(
+            f"SELECT * FROM {_quote(_table_name(filepath))} "
+            f"WHERE {_quote('year')} = ? AND {_quote('month')} = ? ORDER BY rowid",
+            (str(year), str(month))
+        )
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, r)) for r in cur]
+
+    def overwrite_dicts(self, filepath, fieldnames, data):
+        table = _quote(_table_name(filepath))
+        col_list = ", ".join(_quote(f) for f in fieldnames)
+        marks = ", ".join("?" for _ in fieldnames)
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {table}")
+            # Duplicate keys keep the first row, matching the in-memory index.
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO {table} ({col_list}) VALUES ({marks})",
+                ([row.get(f, "") for f in fieldnames] for row in data)
+            )
+            self._bump_version(filepath)
+
+    def upsert_dicts(self, filepath, fieldnames, rows):
+        table = _quote(_table_name(filepath))
+        pk = self.primary_keys[filepath]
+        col_list = ", ".join(_quote(f) for f in fieldnames)
+        marks = ", ".join("?" for _ in fieldnames)
+        updates = ", ".join(f"{_quote(f)}=excluded.{_quote(f)}" for f in fieldnames if f not in pk)
+        conflict = f"ON CONFLICT ({', '.join(_quote(k) for k in pk)}) DO "
+        conflict += f"UPDATE SET {updates}" if updates else "NOTHING"
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {table} ({col_list}) VALUES ({marks}) {conflict}",
+                ([row.get(f, "") for f in fieldnames] for row in rows)
+            )
+            self._bump_version(filepath)
+
+    def delete_keys(self, filepath, keys):
+        """keys: iterable of primary-key tuples, in primary_keys[filepath] order."""
+        table = _quote(_table_name(filepath))
+        where = " AND ".join(f"{_quote(k)}=?" for k in self.primary_keys[filepath])
+        with self.conn:
+            self.conn.executemany(f"DELETE FROM {table} WHERE {where}", [tuple(k) for k in keys])
+            self._bump_version(filepath)
+
+
+def import_csv_files(backend, headers_by_file):
+    """
+    One-shot import: load every CSV file into the SQLite database,
+    replacing whatever the database held for those tables.
+    headers_by_file: { csv_filepath -> [fieldnames] }
+    """
+    counts = {}
+    for filepath, headers in headers_by_file.items():
+        backend.ensure_table(filepath, headers)
+        counts[filepath] = 0
+
+        def rows(filepath=filepath, headers=headers):
+            # streamed straight from the file into executemany, never held as a list
+            for values in iter_csv_rows(filepath, headers):
+                counts[filepath] += 1
+                yield {h: ("" if v is None else v) for h, v in zip(headers, values)}
+
+        backend.overwrite_dicts(filepath, headers, rows())
+    return counts
+
+
+def export_csv_files(backend, headers_by_file):
+    """Write every SQLite table back out to its CSV file."""
+    counts = {}
+    for filepath, headers in headers_by_file.items():
+        rows = backend.read_dicts(filepath)
+        write_csv_file(filepath, headers, rows)
+        counts[filepath] = len(rows)
+    return counts
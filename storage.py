@@ -0,0 +1,91 @@
+"""
+Table layout and storage selection, shared by the GUI (app) and the headless
+command line (cli). Nothing here imports Tk.
+"""
+import os
+
+from data_utils import ensure_csv_headers, set_storage_backend
+from month_status import ensure_month_status_csv, MONTH_STATUS_CSV, MONTH_STATUS_FIELDNAMES
+
+# CSV constants
+EBAY_SKU_CSV = "ebay_sku.csv"
+EBAY_SALES_CSV = "ebay_sales.csv"
+WOO_SKU_CSV = "woo_sku.csv"
+WOO_SALES_CSV = "woo_sales.csv"
+B2B_CSV      = "b2b_data.csv"
+COSTS_CSV    = "costs_data.csv"
+
+SKU_FIELDNAMES = [
+    "month", "year", "sku", "category",
+    "sold_price_after_vat", "sold_price_before_vat",
+    "cost_of_item", "packaging",
+    "transaction_fee", "delivery",
+    "total_expenses", "profit_margin", "profit"
+]
+SALES_FIELDNAMES = ["month", "year", "sku", "units_sold"]
+B2B_FIELDNAMES   = ["month", "year", "business_name", "expense", "profit"]
+COSTS_FIELDNAMES = ["month", "year", "cost_name", "cost_value"]
+
+# Where the tables are stored:
+#   "csv"    - the CSV files, rewritten in full on every save (default)
+#   "sqlite" - SQLITE_DB, with single-row writes (the CSV files are imported on first use)
+#   "log"    - the CSV files plus an append-only "<file>.log", compacted every LOG_COMPACT_THRESHOLD edits
+#   "clustered" - the CSV files kept sorted by month with a "<file>.idx" of each month's byte range,
+#                 so a save rewrites only the months it touched
+#   "partitioned" - one CSV per table and month under PARTITION_DIR (split from the CSV files on first use);
+#                   archived months are read-only
+STORAGE_BACKEND = "csv"
+SQLITE_DB = "profit_tracker.db"
+LOG_COMPACT_THRESHOLD = 1000
+PARTITION_DIR = "data"
+
+# Previous versions of each CSV file kept as "<file>.bak1".."<file>.bakN" on every full rewrite.
+CSV_BACKUPS = 1
+
+TABLE_FIELDNAMES = {
+    EBAY_SKU_CSV:     SKU_FIELDNAMES,
+    EBAY_SALES_CSV:   SALES_FIELDNAMES,
+    WOO_SKU_CSV:      SKU_FIELDNAMES,
+    WOO_SALES_CSV:    SALES_FIELDNAMES,
+    B2B_CSV:          B2B_FIELDNAMES,
+    COSTS_CSV:        COSTS_FIELDNAMES,
+    MONTH_STATUS_CSV: MONTH_STATUS_FIELDNAMES,
+}
+PRIMARY_KEYS = {
+    EBAY_SKU_CSV:     ("year", "month", "sku"),
+    EBAY_SALES_CSV:   ("year", "month", "sku"),
+    WOO_SKU_CSV:      ("year", "month", "sku"),
+    WOO_SALES_CSV:    ("year", "month", "sku"),
+    B2B_CSV:          ("year", "month", "business_name"),
+    COSTS_CSV:        ("year", "month", "cost_name"),
+    MONTH_STATUS_CSV: ("year", "month"),
+}
+
+
+def configure_storage(kind=STORAGE_BACKEND):
+    """Route data_utils through the storage backend named `kind` (see STORAGE_BACKEND)."""
+    if kind == "sqlite":
+        from sqlite_backend import SqliteBackend, import_csv_files
+        first_use = not os.path.isfile(SQLITE_DB)
+        backend = SqliteBackend(SQLITE_DB, PRIMARY_KEYS)
+        if first_use:
+            import_csv_files(backend, TABLE_FIELDNAMES)
+        set_storage_backend(backend)
+    elif kind == "log":
+        from log_backend import LogCsvBackend
+        set_storage_backend(LogCsvBackend(PRIMARY_KEYS, compact_threshold=LOG_COMPACT_THRESHOLD))
+    elif kind == "clustered":
+        from clustered_backend import ClusteredCsvBackend
+        set_storage_backend(ClusteredCsvBackend(PRIMARY_KEYS))
+    elif kind == "partitioned":
+        from partitioned_backend import PartitionedCsvBackend
+        locked = [f for f in TABLE_FIELDNAMES if f != MONTH_STATUS_CSV]
+        set_storage_backend(PartitionedCsvBackend(PRIMARY_KEYS, PARTITION_DIR, locked_tables=locked))
+
+
+def ensure_tables():
+    """Create any missing table with its headers."""
+    for filepath, fieldnames in TABLE_FIELDNAMES.items():
+        if filepath != MONTH_STATUS_CSV:
+            ensure_csv_headers(filepath, fieldnames)
+    ensure_month_status_csv()
@@ -1,12 +1,11 @@
 import tkinter as tk
+from tkinter import messagebox
 import customtkinter as ctk
-import matplotlib
-matplotlib.use("TkAgg")
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from data_utils import read_csv_dicts
 from month_status import is_month_archived
+from sku_rollup import CHANNEL_NAMES
+from category_store import METRICS
+from rollover import months_in_range
 
 EBAY_SKU_CSV = "ebay_sku.csv"
 EBAY_SALES_CSV = "ebay_sales.csv"
@@ -15,6 +14,10 @@ WOO_SALES_CSV = "woo_sales.csv"
 B2B_CSV      = "b2b_data.csv"
 COSTS_CSV    = "costs_data.csv"
 
+# Category trend: this many categories (by the chosen metric) when no single one is picked
+TREND_TOP_CATEGORIES = 8
+TREND_TOP_LABEL = f"Top {TREND_TOP_CATEGORIES}"
+
 
 class SummaryTab:
     def __init__(self, parent_frame, app):
@@ -103,24 +106,97 @@ class SummaryTab:
 
         # -----------------------------------------------------------------
         # Matplotlib Figure for charts
+        # (imported here: the tab is only built when first opened, and
+        #  matplotlib is the slowest import in the app)
         # -----------------------------------------------------------------
-        self.fig = plt.Figure(figsize=(7, 5), dpi=100)
+        import matplotlib
+        matplotlib.use("TkAgg")
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.fig = Figure(figsize=(7, 5), dpi=100)
         self.ax = self.fig.add_subplot(111)  # single subplot for the line chart
         self.chart_canvas = FigureCanvasTkAgg(self.fig, master=self.summary_scroll_container)
         self.chart_canvas.get_tk_widget().pack(pady=10, fill="both", expand=True)
 
+        # -----------------------------------------------------------------
+        # 3) SKU profitability across eBay and Woo (see sku_rollup);
+        #    "Top SKUs" uses the From/To range above
+        # -----------------------------------------------------------------
+        sku_frame = ctk.CTkFrame(self.summary_scroll_container)
+        sku_frame.pack(pady=5, padx=5, fill="x")
+
+        ctk.CTkLabel(sku_frame, text="Top:").grid(row=0, column=0, padx=5, pady=5)
+        self.top_n_var = tk.StringVar(value="20")
+        self.top_n_cb = ctk.CTkComboBox(
+            sku_frame,
+            values=["10", "20", "50", "100"],
+            variable=self.top_n_var,
+            width=80
+        )
+        self.top_n_cb.grid(row=0, column=1, padx=5, pady=5)
+
+        top_btn = ctk.CTkButton(sku_frame, text="Top SKUs by Profit (From/To)", command=self.show_top_skus)
+        top_btn.grid(row=0, column=2, padx=10, pady=5)
+
+        ctk.CTkLabel(sku_frame, text="SKU:").grid(row=0, column=3, padx=5, pady=5)
+        self.sku_lookup_var = tk.StringVar()
+        ctk.CTkEntry(sku_frame, textvariable=self.sku_lookup_var, width=140).grid(row=0, column=4, padx=5, pady=5)
+
+        history_btn = ctk.CTkButton(sku_frame, text="SKU History", command=self.show_sku_history)
+        history_btn.grid(row=0, column=5, padx=10, pady=5)
+
+        self.sku_report_text = ctk.CTkTextbox(self.summary_scroll_container, height=250, corner_radius=10)
+        self.sku_report_text.pack(pady=5, fill="x")
+
+        # -----------------------------------------------------------------
+        # 4) Category trend chart over the From/To range (see category_store)
+        # -----------------------------------------------------------------
+        trend_frame = ctk.CTkFrame(self.summary_scroll_container)
+        trend_frame.pack(pady=5, padx=5, fill="x")
+
+        ctk.CTkLabel(trend_frame, text="Show:").grid(row=0, column=0, padx=5, pady=5)
+        self.trend_metric_var = tk.StringVar(value="profit")
+        self.trend_metric_cb = ctk.CTkComboBox(
+            trend_frame,
+            values=list(METRICS),
+            variable=self.trend_metric_var
+        )
+        self.trend_metric_cb.grid(row=0, column=1, padx=5, pady=5)
+
+        ctk.CTkLabel(trend_frame, text="Category:").grid(row=0, column=2, padx=5, pady=5)
+        self.trend_category_var = tk.StringVar(value=TREND_TOP_LABEL)
+        self.trend_category_cb = ctk.CTkComboBox(
+            trend_frame,
+            values=[TREND_TOP_LABEL],
+            variable=self.trend_category_var
+        )
+        self.trend_category_cb.grid(row=0, column=3, padx=5, pady=5)
+
+        trend_btn = ctk.CTkButton(trend_frame, text="Generate Category Trend", command=self.generate_category_trend)
+        trend_btn.grid(row=0, column=4, padx=10, pady=5)
+
+        self.trend_fig = Figure(figsize=(7, 5), dpi=100)
+        self.trend_ax = self.trend_fig.add_subplot(111)
+        self.trend_canvas = FigureCanvasTkAgg(self.trend_fig, master=self.summary_scroll_container)
+        self.trend_canvas.get_tk_widget().pack(pady=10, fill="both", expand=True)
+
     # ---------------------------------------------------------------------
     # Old summary method (kept intact)
     # ---------------------------------------------------------------------
     def generate_monthly_summary(self):
+        # 1) Build monthly aggregates for Profit & Expenses (on the I/O worker)
+        self.app.io.submit(
+            self._load_monthly_aggregates,
+            on_done=self._show_monthly_summary,
+            channel="summary_report"
+        )
+
+    def _show_monthly_summary(self, monthly_aggregates):
         self.summary_report_text.delete("0.0", "end")
         chosen_month = self.summary_month_var.get()
         chosen_year = self.summary_year_var.get()
 
-        # 1) Build monthly aggregates for Profit & Expenses
-        monthly_aggregates = {}  # dict of (year, month) -> { "profit": float, "expense": float }
-        self._build_monthly_aggregates(monthly_aggregates)
-
         lines = []
 
         if chosen_month != "All":
@@ -156,9 +232,13 @@ class SummaryTab:
     # ---------------------------------------------------------------------
     def generate_line_chart(self):
         # Build monthly aggregates for all available data
-        monthly_aggregates = {}
-        self._build_monthly_aggregates(monthly_aggregates)
+        self.app.io.submit(
+            self._load_monthly_aggregates,
+            on_done=self._draw_line_chart,
+            channel="summary_chart"
+        )
 
+    def _draw_line_chart(self, monthly_aggregates):
         # parse from/to
         from_y = int(self.from_year_var.get())
         from_m = int(self.from_month_var.get())
@@ -215,78 +295,136 @@ class SummaryTab:
         self.fig.tight_layout()
         self.chart_canvas.draw()
 
+    # ---------------------------------------------------------------------
+    # SKU profitability across channels (from the per-SKU rollups)
+    # ---------------------------------------------------------------------
+    def show_top_skus(self):
+        try:
+            n = int(self.top_n_var.get())
+            start = (int(self.from_year_var.get()), int(self.from_month_var.get()))
+            end = (int(self.to_year_var.get()), int(self.to_month_var.get()))
+        except ValueError:
+            messagebox.showerror("Error", "Top and From/To month and year must be whole numbers.")
+            return
+        self.app.io.submit(
+            lambda: self._build_top_skus_report(n, start, end),
+            on_done=self._render_sku_report,
+            channel="summary_skus"
+        )
+
+    def _build_top_skus_report(self, n, start, end):
+        top = self.app.sku_rollup.top_skus(n, start, end)
+        lines = [f"--- Top {n} SKUs by Profit, {start[1]}/{start[0]} to {end[1]}/{end[0]} (eBay + Woo) ---"]
+        if not top:
+            lines.append("No sales in this range.")
+        for rank, item in enumerate(top, 1):
+            lines.append(
+                f"{rank}. SKU: {item['sku']}, Units Sold: {item['units']}, "
+                f"Profit: £{item['profit']:.2f}, Margin: {item['margin']:.2f}%  "
+                f"[{self._channel_breakdown(item['channels'])}]"
+            )
+        return lines
+
+    def show_sku_history(self):
+        sku = self.sku_lookup_var.get().strip()
+        if not sku:
+            messagebox.showerror("Error", "Enter a SKU.")
+            return
+        self.app.io.submit(
+            lambda: self._build_sku_history_report(sku),
+            on_done=self._render_sku_report,
+            channel="summary_skus"
+        )
+
+    def _build_sku_history_report(self, sku):
+        history = self.app.sku_rollup.sku_history(sku)
+        lines = [f"--- {sku} by Month (eBay + Woo) ---"]
+        if not history:
+            lines.append(f"No sales found for SKU {sku}.")
+            return lines
+        total_units = 0
+        total_profit = 0.0
+        for (year, month), channels in history.items():
+            lines.append(f"{month}/{year}: {self._channel_breakdown(channels)}")
+            total_units += sum(c["units"] for c in channels.values())
+            total_profit += sum(c["profit"] for c in channels.values())
+        lines.append(f"Total: {total_units} units, £{total_profit:.2f} profit")
+        return lines
+
+    def _channel_breakdown(self, channels):
+        return ", ".join(
+            f"{CHANNEL_NAMES[ch]}: {c['units']} units, £{c['profit']:.2f} ({c['margin']:.2f}%)"
+            for ch, c in channels.items()
+        )
+
+    def _render_sku_report(self, lines):
+        self.sku_report_text.delete("0.0", "end")
+        self.sku_report_text.insert("0.0", "\n".join(lines) + "\n")
+
+    # ---------------------------------------------------------------------
+    # Category trend chart (reads only the category store)
+    # ---------------------------------------------------------------------
+    def generate_category_trend(self):
+        try:
+            start = (int(self.from_year_var.get()), int(self.from_month_var.get()))
+            end = (int(self.to_year_var.get()), int(self.to_month_var.get()))
+        except ValueError:
+            messagebox.showerror("Error", "From/To month and year must be whole numbers.")
+            return
+        metric = self.trend_metric_var.get()
+        if metric not in METRICS:
+            messagebox.showerror("Error", f"Show must be one of: {', '.join(METRICS)}.")
+            return
+        category = self.trend_category_var.get()
+        self.app.io.submit(
+            lambda: self.app.category_store.trend(start, end),
+            on_done=lambda trend: self._draw_category_trend(trend, start, end, metric, category),
+            channel="summary_category_trend"
+        )
+
+    def _draw_category_trend(self, trend, start, end, metric, category):
+        self.trend_category_cb.configure(values=[TREND_TOP_LABEL] + sorted(trend))
+
+        if category in trend:
+            shown = [category]
+        else:
+            # biggest categories over the whole range first
+            shown = sorted(trend, key=lambda c: -sum(t[metric] for t in trend[c].values()))
+            shown = shown[:TREND_TOP_CATEGORIES]
+
+        ym_list = months_in_range(*start, *end)
+        x_labels = [f"{m}/{y}" for y, m in ym_list]
+
+        self.trend_ax.clear()
+        for cat in shown:
+            series = trend[cat]
+            values = [series[ym][metric] if ym in series else 0 for ym in ym_list]
+            self.trend_ax.plot(x_labels, values, marker='o', label=cat or "(none)")
+        self.trend_ax.set_title(f"Category {metric.capitalize()} by Month (eBay + Woo)")
+        self.trend_ax.set_xlabel("Month/Year")
+        self.trend_ax.set_ylabel("Units" if metric == "units" else "GBP (£)")
+        if shown:
+            self.trend_ax.legend()
+        self.trend_ax.grid(True)
+        self.trend_ax.set_xticks(range(len(x_labels)))
+        self.trend_ax.set_xticklabels(x_labels, rotation=45, ha='right')
+
+        self.trend_fig.tight_layout()
+        self.trend_canvas.draw()
+
     # ---------------------------------------------------------------------
     # Helper to fill `monthly_aggregates` with profit & expense
     # ---------------------------------------------------------------------
+    def _load_monthly_aggregates(self):
+        monthly_aggregates = {}  # dict of (year, month) -> { "profit": float, "expense": float }
+        self._build_monthly_aggregates(monthly_aggregates)
+        return monthly_aggregates
+
     def _build_monthly_aggregates(self, monthly_aggregates):
         """
         Fills up the monthly_aggregates dict: 
           (year, month) -> {"profit": float, "expense": float}
         from eBay, Woo, B2B data, etc.
+        Only months written since the last call are recomputed (see monthly_cache).
         """
-
-        # eBay
-        ebay_skus = read_csv_dicts(EBAY_SKU_CSV)
-        ebay_sales = read_csv_dicts(EBAY_SALES_CSV)
-        # Convert to (year,month,sku)->profit
-        ebay_profit_map = {}
-        for row in ebay_skus:
-            try:
-                p = float(row["profit"])
-            except:
-                p = 0.0
-            ebay_profit_map[(row["year"], row["month"], row["sku"])] = p
-
-        for s_row in ebay_sales:
-            y, m, sku = s_row["year"], s_row["month"], s_row["sku"]
-            try:
-                units_sold = int(s_row["units_sold"])
-            except:
-                units_sold = 0
-            key = (y,m,sku)
-            if key in ebay_profit_map:
-                total_line_profit = ebay_profit_map[key] * units_sold
-                self._add_monthly_values(monthly_aggregates, y, m, profit_delta=total_line_profit, expense_delta=0.0)
-
-        # Woo
-        woo_skus = read_csv_dicts(WOO_SKU_CSV)
-        woo_sales = read_csv_dicts(WOO_SALES_CSV)
-        woo_profit_map = {}
-        for row in woo_skus:
-            try:
-                p = float(row["profit"])
-            except:
-                p = 0.0
-            woo_profit_map[(row["year"], row["month"], row["sku"])] = p
-
-        for s_row in woo_sales:
-            y, m, sku = s_row["year"], s_row["month"], s_row["sku"]
-            try:
-                units_sold = int(s_row["units_sold"])
-            except:
-                units_sold = 0
-            key = (y,m,sku)
-            if key in woo_profit_map:
-                total_line_profit = woo_profit_map[key] * units_sold
-                self._add_monthly_values(monthly_aggregates, y, m, profit_delta=total_line_profit, expense_delta=0.0)
-
-        # B2B
-        b2b_rows = read_csv_dicts(B2B_CSV)
-        for row in b2b_rows:
-            y, m = row["year"], row["month"]
-            try:
-                e = float(row["expense"])
-            except:
-                e = 0.0
-            try:
-                p = float(row["profit"])
-            except:
-                p = 0.0
-            self._add_monthly_values(monthly_aggregates, y, m, profit_delta=p, expense_delta=e)
-
-    def _add_monthly_values(self, monthly_aggregates, y, m, profit_delta, expense_delta):
-        key = (y, m)
-        if key not in monthly_aggregates:
-            monthly_aggregates[key] = {"profit":0.0, "expense":0.0}
-        monthly_aggregates[key]["profit"]  += profit_delta
-        monthly_aggregates[key]["expense"] += expense_delta
+        monthly_aggregates.update(self.app.monthly_cache.monthly_totals())
@@ -0,0 +1,148 @@
+"""
+Virtualised ttk.Treeview for large tables (e.g. thousands of SKUs under "All").
+
+Only the visible rows plus `buffer` rows above and below are inserted into the
+Treeview; the full (already filtered) list lives in Python. The scrollbar is
+driven from the full list, and scrolling near the edge of the materialised
+window moves the window. Updates diff by item id (the SKU), so only rows that
+appeared, disappeared, moved or changed touch Tk.
+"""
+from tkinter import ttk
+
+
+class VirtualTreeview(ttk.Frame):
+    def __init__(self, master, columns, height=10, buffer=50, **kwargs):
+        """
+        columns: column ids, as for ttk.Treeview
+        height:  visible rows
+        buffer:  extra rows kept materialised above and below the visible ones
+        """
+        super().__init__(master, **kwargs)
+        self.height = height
+        self.buffer = buffer
+        self._rows = []       # [(iid, values), ...] the full list, in display order
+        self._values = {}     # iid -> values
+        self._shown = {}      # iid -> values, for the rows currently in the Treeview
+        self._start = 0       # index in _rows of the first materialised row
+        self._end = 0         # index in _rows after the last materialised row
+        self._top = 0         # index in _rows of the first visible row
+        self._rendering = False
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=height)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.configure(yscrollcommand=self._on_tree_scrolled)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+    # --------------------------------------------------
+    # Treeview pass-throughs used by the tabs
+    # --------------------------------------------------
+    def heading(self, column, **kwargs):
+        return self.tree.heading(column, **kwargs)
+
+    def column(self, column, **kwargs):
+        return self.tree.column(column, **kwargs)
+
+    def selection(self):
+        return self.tree.selection()
+
+    def item(self, iid, option=None):
+        if option == "values":
+            return self._values.get(iid, ())
+        return self.tree.item(iid, option)
+
+    # --------------------------------------------------
+    # Data
+    # --------------------------------------------------
+    def set_rows(self, rows):
+        """rows: [(iid, values), ...]; a repeated iid gets a "#2", "#3", ... suffix."""
+        seen = {}
+        unique = []
+        for iid, values in rows:
+            iid = str(iid)
+            if iid in seen:
+                seen[iid] += 1
+                iid = f"{iid}#{seen[iid]}"
+            else:
+                seen[iid] = 1
+            unique.append((iid, tuple(values)))
+        self._rows = unique
+        self._values = dict(unique)
+        self._show(self._top)
+
+    def __len__(self):
+        return len(self._rows)
+
+    # --------------------------------------------------
+    # Windowing
+    # --------------------------------------------------
+    def _show(self, top):
+        n = len(self._rows)
+        top = max(0, min(top, n - self.height))
+        start = max(0, top - self.buffer)
+        end = min(n, top + self.height + self.buffer)
+
+        self._rendering = True
+        try:
+            self._materialise(start, end)
+            self._start, self._end, self._top = start, end, top
+            if end > start:
+                self.tree.yview_moveto((top - start) / (end - start))
+        finally:
+            self._rendering = False
+        self._update_scrollbar()
+
+    def _materialise(self, start, end):
+        """Make the Treeview hold exactly _rows[start:end], touching only what differs."""
+        wanted = self._rows[start:end]
+        wanted_ids = {iid for iid, _ in wanted}
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted_ids]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self._shown[iid]
+
+        current = list(self.tree.get_children())
+        for index, (iid, values) in enumerate(wanted):
+            if iid not in self._shown:
+                self.tree.insert("", index, iid=iid, values=values)
+                current.insert(index, iid)
+            else:
+                if index >= len(current) or current[index] != iid:
+                    self.tree.move(iid, "", index)
+                    current.remove(iid)
+                    current.insert(index, iid)
+                if self._shown[iid] != values:
+                    self.tree.item(iid, values=values)
+            self._shown[iid] = values
+
+    def _update_scrollbar(self):
+        n = len(self._rows)
+        if n <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._top / n, min(1.0, (self._top + self.height) / n))
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._show(int(float(amount) * len(self._rows)))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self._show(self._top + int(amount) * step)
+
+    def _on_tree_scrolled(self, first, last):
+        """The Treeview scrolled itself (mouse wheel, keyboard): follow it, re-window near the edges."""
+        if self._rendering or self._end <= self._start:
+            return
+        local = round(float(first) * (self._end - self._start))
+        self._top = self._start + local
+        self._update_scrollbar()
+
+        margin = self.buffer // 2
+        near_top = local < margin and self._start > 0
+        near_bottom = self._top + self.height > self._end - margin and self._end < len(self._rows)
+        if near_top or near_bottom:
+            top = self._top
+            self.after_idle(lambda: self._show(top))